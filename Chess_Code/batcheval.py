@@ -0,0 +1,192 @@
+"""
+batcheval.py - Evaluates many positions at once with NumPy, e.g. to score the positions of a game
+database offline, or to tune the piece square tables of engine.py with Texel's method (fitting the
+evaluation to the results of the games the positions come from). The scores are exactly those of
+evaluate() in engine.py, but a batch of positions is scored as one (N,64) array of piece indexes
+instead of one position at a time.
+
+    $ python batcheval.py benchmark.epd             #Print the evaluation of every position
+    $ python batcheval.py benchmark.epd --check     #Compare with evaluate(), and time both
+"""
+import argparse
+import time
+import numpy as np
+import engine
+
+
+#Piece indexes of the arrays of positions: 0 is an empty square, then the white pieces, then
+#the black ones. Squares are numbered as in engine.py: y*8+x, a8 first.
+PIECES = [0] + [kind+color for color in 'wb' for kind in 'PNBRQK']
+PIECE_INDEX = dict((piece,i) for i,piece in enumerate(PIECES))
+FEN_INDEX = dict((kind if color=='w' else kind.lower(),PIECE_INDEX[kind+color])
+                 for kind in 'PNBRQK' for color in 'wb')
+#Material of each side counted in pawns by piece index, used to tell the ending (see evaluate()):
+WHITE_MATERIAL = np.array([0] + [engine.PHASE_MATERIAL[piece[0]] if piece[1]=='w' else 0
+                                 for piece in PIECES[1:]])
+BLACK_MATERIAL = np.array([0] + [engine.PHASE_MATERIAL[piece[0]] if piece[1]=='b' else 0
+                                 for piece in PIECES[1:]])
+SQUARES = np.arange(64)
+
+
+def fens2array(fens):
+    """
+    fens2array(fens) - Returns the (N,64) array of piece indexes of a list of FEN (or EPD)
+    strings. Only the piece placement is read.
+    """
+    pieces = np.zeros((len(fens),64),dtype=np.int8)
+    for n,fen in enumerate(fens):
+        sq = 0
+        for char in fen.split()[0]:
+            if char.isdigit():
+                sq += int(char)
+            elif char!='/':
+                pieces[n,sq] = FEN_INDEX[char]
+                sq += 1
+    return pieces
+
+
+def boards2array(boards):
+    """
+    boards2array(boards) - Returns the (N,64) array of piece indexes of a list of boards, 8x8
+    lists as in GamePosition ('Pw', 'Kb'... or 0 for an empty square).
+    """
+    pieces = np.zeros((len(boards),64),dtype=np.int8)
+    for n,board in enumerate(boards):
+        pieces[n] = [PIECE_INDEX[piece] for row in board for piece in row]
+    return pieces
+
+
+def positions2array(positions):
+    """
+    positions2array(positions) - Returns the (N,64) array of piece indexes of a list of
+    GamePositions, and the number of moves of the game played before each (gamePlies, which
+    evaluate() uses to tell the ending), for evaluateBatch().
+    """
+    return (boards2array([position.board for position in positions]),
+            np.array([position.gamePlies for position in positions]))
+
+
+def scoreTables(tables=None,kingEndgameTable=None,pieceValues=None):
+    """
+    scoreTables(tables,kingEndgameTable,pieceValues) - Returns the (13,64) arrays of the score of
+    each piece index on each square, in the opening and in the ending, as makeScoreTables() in
+    engine.py does. By default the piece square tables and piece values of engine.py are used;
+    to try others (e.g. when tuning them), pass tables as a dictionary of piece square tables by
+    kind ({'P': pawn_table,...}, as lists of 64 scores from white's point of view),
+    kingEndgameTable and pieceValues ({'P': 100,...}). Those not given keep their values.
+    """
+    kinds = {'P': engine.pawn_table, 'N': engine.knight_table, 'B': engine.bishop_table,
+             'R': engine.rook_table, 'Q': engine.queen_table, 'K': engine.king_table}
+    kinds.update(tables or {})
+    if kingEndgameTable is None:
+        kingEndgameTable = engine.king_endgame_table
+    values = dict(engine.PIECE_VALUES)
+    values.update(pieceValues or {})
+    #Black pieces use the tables upside down, with negative scores:
+    flipped = (7 - SQUARES//8)*8 + SQUARES%8
+    opening = np.zeros((len(PIECES),64),dtype=np.int64)
+    ending = np.zeros((len(PIECES),64),dtype=np.int64)
+    for i,piece in enumerate(PIECES[1:],1):
+        kind,color = piece
+        squares,sign = (SQUARES,1) if color=='w' else (flipped,-1)
+        opening[i] = sign*(values[kind] + np.asarray(kinds[kind])[squares])
+        if kind == 'K':
+            ending[i] = sign*(values[kind] + np.asarray(kingEndgameTable)[squares])
+        else:
+            ending[i] = opening[i]
+    return opening,ending
+
+
+def pawnTerms(pieces):
+    """
+    pawnTerms(pieces) - Returns the pawn structure term of evaluate() for each position of an
+    (N,64) array: -30 per doubled, isolated or blocked white pawn, +30 per black one.
+    """
+    count = len(pieces)
+    whitePawns = pieces == PIECE_INDEX['Pw']
+    blackPawns = pieces == PIECE_INDEX['Pb']
+    whitePieces = (pieces>=PIECE_INDEX['Pw']) & (pieces<=PIECE_INDEX['Kw'])
+    blackPieces = pieces>=PIECE_INDEX['Pb']
+    terms = np.zeros(count,dtype=np.int64)
+    for pawns,sign in ((whitePawns,1),(blackPawns,-1)):
+        #Pawns on each file:
+        files = pawns.reshape(count,8,8).sum(axis=1)
+        doubled = np.maximum(files-1,0).sum(axis=1)
+        occupied = np.pad(files>0,((0,0),(1,1)))
+        neighbours = occupied[:,:-2] | occupied[:,2:]
+        isolated = (files*~neighbours).sum(axis=1)
+        terms += sign*(doubled + isolated)
+    #Blocked pawns have an enemy piece on the next square up (white) or down (black) the board:
+    terms += (whitePawns[:,8:] & blackPieces[:,:-8]).sum(axis=1)
+    terms -= (blackPawns[:,:-8] & whitePieces[:,8:]).sum(axis=1)
+    return -30*terms
+
+
+def evaluateBatch(pieces,plies=None,tables=None):
+    """
+    evaluateBatch(pieces,plies,tables) - Returns the evaluate() score of each position of an
+    (N,64) array of piece indexes, from white's point of view. plies is the gamePlies of each
+    position, the moves of the game played before it (0 by default, as for positions read from
+    a FEN). tables are the score tables to use, as returned by scoreTables(); by default those
+    of engine.py.
+    """
+    pieces = np.asarray(pieces,dtype=np.intp)
+    if plies is None:
+        plies = np.zeros(len(pieces),dtype=np.int64)
+    opening,ending = tables if tables is not None else defaultTables()
+    whiteMaterial = WHITE_MATERIAL[pieces].sum(axis=1)
+    blackMaterial = BLACK_MATERIAL[pieces].sum(axis=1)
+    isEnding = (np.asarray(plies)>40) | ((whiteMaterial<14) & (blackMaterial<14))
+    scores = np.where(isEnding,ending[pieces,SQUARES].sum(axis=1),
+                      opening[pieces,SQUARES].sum(axis=1))
+    return scores + pawnTerms(pieces)
+
+
+def texelError(scores,results,k=1.0):
+    """
+    texelError(scores,results,k) - The error minimised by Texel's tuning method: the mean squared
+    difference between the result of each game (1 for a white win, 0.5 for a draw, 0 for a black
+    win) and the result the evaluation of one of its positions predicts,
+    1/(1+10**(-k*score/400)).
+    """
+    predicted = 1.0/(1.0 + 10.0**(-k*np.asarray(scores)/400.0))
+    return float(np.mean((np.asarray(results) - predicted)**2))
+
+
+def defaultTables():
+    """
+    defaultTables() - Returns the score tables of engine.py, made by scoreTables() the first
+    time.
+    """
+    global DEFAULT_TABLES
+    if DEFAULT_TABLES is None:
+        DEFAULT_TABLES = scoreTables()
+    return DEFAULT_TABLES
+
+
+DEFAULT_TABLES = None
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Evaluate a file of positions with NumPy.')
+    parser.add_argument('positions',help='file with one FEN or EPD position per line')
+    parser.add_argument('--check',action='store_true',
+                        help='compare with evaluate() of engine.py, and time both')
+    args = parser.parse_args()
+
+    with open(args.positions) as file_handle:
+        fens = [line.strip() for line in file_handle if len(line.split())>=4]
+    start = time.time()
+    scores = evaluateBatch(fens2array(fens))
+    seconds = time.time() - start
+    if not args.check:
+        for fen,score in zip(fens,scores):
+            print('%6d  %s' % (score,fen))
+    else:
+        start = time.time()
+        expected = [engine.evaluate(engine.fen2pos(fen)) for fen in fens]
+        scalarSeconds = time.time() - start
+        wrong = sum(1 for score,value in zip(scores,expected) if score!=value)
+        print('%d positions, %d different from evaluate()' % (len(fens),wrong))
+        print('evaluateBatch: %.4f s, evaluate(): %.4f s (including reading the FENs)' %
+              (seconds,scalarSeconds))
@@ -0,0 +1,229 @@
+"""
+benchmark.py - Measures the speed of the AI's search on a fixed set of positions (benchmark.epd).
+Each position is searched to a fixed depth and for a fixed time, starting from an empty
+transposition table. The nodes, nodes per second, time to reach each depth, transposition table
+hit rate and chosen move are written to benchmark_results.json and benchmark_results.csv, and
+compared with a saved baseline. With several workers, the fixed depth search of every position is
+also timed with one process and with all of them, to measure the speedup of the parallel search.
+
+    $ python benchmark.py                   #Run and compare with benchmark_baseline.json
+    $ python benchmark.py --save-baseline   #Run and make the results the new baseline
+    $ python benchmark.py --no-null-move --no-lmr   #Measure what the selective search saves
+    $ python benchmark.py --workers 4       #Measure the speedup of 4 processes over 1
+"""
+import argparse
+import csv
+import json
+import os
+import time
+import engine
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+POSITIONS_FILE = os.path.join(HERE,'benchmark.epd')
+RESULTS_FILE = os.path.join(HERE,'benchmark_results.json')
+CSV_FILE = os.path.join(HERE,'benchmark_results.csv')
+BASELINE_FILE = os.path.join(HERE,'benchmark_baseline.json')
+#The searches of every position: to a fixed depth, and for a fixed number of seconds:
+BENCH_DEPTH = 4
+BENCH_TIME = 1.0
+
+
+def loadEPD(filename=POSITIONS_FILE):
+    """
+    loadEPD(filename) - Reads a file of positions in EPD format, one per line: the first four
+    fields of a FEN, then operations such as bm (best move) and id. Returns a list of
+    dictionaries with the keys 'id', 'fen' and 'bm'.
+    """
+    positions = []
+    with open(filename) as file_handle:
+        for line in file_handle:
+            fields = line.split()
+            if len(fields)<4:
+                continue
+            operations = {}
+            for operation in ' '.join(fields[4:]).split(';'):
+                if operation.strip():
+                    name,_,value = operation.strip().partition(' ')
+                    operations[name] = value.strip('"')
+            positions.append({'id': operations.get('id',str(len(positions)+1)),
+                              'fen': ' '.join(fields[:4]),
+                              'bm': operations.get('bm','')})
+    return positions
+
+
+def benchmarkSearch(fen,timeLimit,maxDepth,workers):
+    """
+    benchmarkSearch(fen,timeLimit,maxDepth,workers) - Searches a position with an empty
+    transposition table and returns the statistics of the search.
+    """
+    position = engine.fen2pos(fen)
+    colorsign = 1 if position.player==0 else -1
+    engine.newGame()
+    move = []
+    start = time.time()
+    engine.iterativeDeepening(position,colorsign,move,timeLimit,maxDepth,workers,False)
+    seconds = time.time() - start
+    stats = engine.lastSearch
+    return {'depth': stats['depth'],
+            'nodes': stats['nodes'],
+            'time': seconds,
+            'nps': stats['nodes']/max(seconds,1e-9),
+            'tableHitRate': stats['tableHitRate'],
+            'move': engine.move2uci(move) if move else '',
+            'timeToDepth': [iteration['time'] for iteration in stats['iterations']],
+            'nodesToDepth': [iteration['nodes'] for iteration in stats['iterations']]}
+
+
+def runBenchmark(positions,depth=BENCH_DEPTH,seconds=BENCH_TIME,workers=1):
+    """
+    runBenchmark(positions,depth,seconds,workers) - Searches every position to the given depth,
+    then for the given number of seconds, printing the results as they come. Returns all the
+    results, as saved by saveResults().
+    """
+    results = {'settings': {'depth': depth, 'time': seconds, 'workers': workers,
+                            'nullMove': engine.NULL_MOVE,
+                            'lateMoveReductions': engine.LATE_MOVE_REDUCTIONS,
+                            'date': time.strftime('%Y-%m-%d %H:%M:%S')},
+               'positions': []}
+    for entry in positions:
+        result = dict(entry)
+        result['fixedDepth'] = benchmarkSearch(entry['fen'],float('inf'),depth,workers)
+        result['fixedTime'] = benchmarkSearch(entry['fen'],seconds,engine.DEPTH,workers)
+        results['positions'].append(result)
+        fixedDepth,fixedTime = result['fixedDepth'],result['fixedTime']
+        print('%-12s depth %d: %7d nodes %7.2f s %6.0f nps  TT hits %4.1f%%  %-6s| '
+              '%.1f s: depth %d %7d nodes  %-6s' %
+              (entry['id'],depth,fixedDepth['nodes'],fixedDepth['time'],fixedDepth['nps'],
+               fixedDepth['tableHitRate'],fixedDepth['move'],seconds,fixedTime['depth'],
+               fixedTime['nodes'],fixedTime['move']))
+    return results
+
+
+def runSpeedup(positions,depth=BENCH_DEPTH,workers=2):
+    """
+    runSpeedup(positions,depth,workers) - Searches every position to the given depth with one
+    process and with workers processes (see measureSpeedup() in engine.py), printing the time and
+    node ratios of the parallel search against the single one as they come. Returns the results,
+    one dictionary per position, as saved with the others under 'speedup'.
+    """
+    speedups = []
+    for entry in positions:
+        position = engine.fen2pos(entry['fen'])
+        colorsign = 1 if position.player==0 else -1
+        oneTime,manyTime,oneNodes,manyNodes = engine.measureSpeedup(position,colorsign,depth,
+                                                                    workers)
+        speedups.append({'id': entry['id'], 'time': oneTime, 'parallelTime': manyTime,
+                         'nodes': oneNodes, 'parallelNodes': manyNodes})
+        print('%-12s 1 worker: %7d nodes %7.2f s | %d workers: %7d nodes %7.2f s | '
+              'nodes x%.2f  speedup x%.2f' %
+              (entry['id'],oneNodes,oneTime,workers,manyNodes,manyTime,
+               manyNodes/float(max(oneNodes,1)),oneTime/max(manyTime,1e-9)))
+    oneTime = sum(speedup['time'] for speedup in speedups)
+    manyTime = sum(speedup['parallelTime'] for speedup in speedups)
+    oneNodes = sum(speedup['nodes'] for speedup in speedups)
+    manyNodes = sum(speedup['parallelNodes'] for speedup in speedups)
+    print('Total        nodes x%.2f  speedup x%.2f with %d workers' %
+          (manyNodes/float(max(oneNodes,1)),oneTime/max(manyTime,1e-9),workers))
+    return speedups
+
+
+def totals(results,search):
+    """
+    totals(results,search) - Returns the total nodes and seconds of one kind of search
+    ('fixedDepth' or 'fixedTime') over all the positions.
+    """
+    nodes = sum(result[search]['nodes'] for result in results['positions'])
+    seconds = sum(result[search]['time'] for result in results['positions'])
+    return nodes,seconds
+
+
+def saveResults(results,jsonFile=RESULTS_FILE,csvFile=CSV_FILE):
+    """
+    saveResults(results,jsonFile,csvFile) - Writes the results to a JSON file, and to a CSV file
+    with one row per position and kind of search.
+    """
+    with open(jsonFile,'w') as file_handle:
+        json.dump(results,file_handle,indent=1)
+    maxDepth = max([len(result['fixedDepth']['timeToDepth']) for result in results['positions']]
+                   + [results['settings']['depth']])
+    with open(csvFile,'w',newline='') as file_handle:
+        writer = csv.writer(file_handle)
+        writer.writerow(['id','search','depth','nodes','time','nps','tt_hit_rate','move','bm']
+                        + ['time_to_depth_%d' % (depth+1) for depth in range(maxDepth)])
+        for result in results['positions']:
+            for search in ('fixedDepth','fixedTime'):
+                stats = result[search]
+                timeToDepth = ['%.4f' % seconds for seconds in stats['timeToDepth']]
+                writer.writerow([result['id'],search,stats['depth'],stats['nodes'],
+                                 '%.4f' % stats['time'],'%.0f' % stats['nps'],
+                                 '%.1f' % stats['tableHitRate'],stats['move'],result['bm']]
+                                + timeToDepth + ['']*(maxDepth-len(timeToDepth)))
+
+
+def loadResults(filename=RESULTS_FILE):
+    """
+    loadResults(filename) - Reads results saved by saveResults(), e.g. for the plotting scripts.
+    """
+    with open(filename) as file_handle:
+        return json.load(file_handle)
+
+
+def compareResults(results,baseline):
+    """
+    compareResults(results,baseline) - Prints how each position's fixed depth search changed
+    since the baseline: nodes and speed as ratios (new/old), and whether the move changed.
+    The node counts of a fixed depth search don't depend on the machine, the times do.
+    """
+    old = dict((result['id'],result) for result in baseline['positions'])
+    print('Compared with the baseline of %s:' % baseline['settings']['date'])
+    newNodes = baseNodes = 0
+    newSeconds = baseSeconds = 0.0
+    for result in results['positions']:
+        if result['id'] not in old:
+            continue
+        new,base = result['fixedDepth'],old[result['id']]['fixedDepth']
+        if base['depth']!=new['depth']:
+            print('%-12s searched to depth %d, the baseline to depth %d' %
+                  (result['id'],new['depth'],base['depth']))
+            continue
+        newNodes += new['nodes']
+        baseNodes += base['nodes']
+        newSeconds += new['time']
+        baseSeconds += base['time']
+        print('%-12s nodes x%.2f  nps x%.2f  time x%.2f  %s' %
+              (result['id'],new['nodes']/float(max(base['nodes'],1)),
+               new['nps']/max(base['nps'],1e-9),new['time']/max(base['time'],1e-9),
+               'same move' if new['move']==base['move'] else
+               'move %s (was %s)' % (new['move'],base['move'])))
+    print('Total        nodes x%.2f  time x%.2f' %
+          (newNodes/float(max(baseNodes,1)),newSeconds/max(baseSeconds,1e-9)))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the search on a fixed set of positions.')
+    parser.add_argument('--positions',default=POSITIONS_FILE,help='EPD file of positions')
+    parser.add_argument('--depth',type=int,default=BENCH_DEPTH,help='depth of the fixed depth search')
+    parser.add_argument('--time',type=float,default=BENCH_TIME,help='seconds of the fixed time search')
+    parser.add_argument('--workers',type=int,default=1,help='processes searching each position')
+    parser.add_argument('--no-null-move',action='store_true',help='turn off null move pruning')
+    parser.add_argument('--no-lmr',action='store_true',help='turn off late move reductions')
+    parser.add_argument('--baseline',default=BASELINE_FILE,help='results to compare with')
+    parser.add_argument('--save-baseline',action='store_true',help='make these results the baseline')
+    args = parser.parse_args()
+
+    if args.no_null_move:
+        engine.NULL_MOVE = False
+    if args.no_lmr:
+        engine.LATE_MOVE_REDUCTIONS = False
+    results = runBenchmark(loadEPD(args.positions),args.depth,args.time,args.workers)
+    nodes,seconds = totals(results,'fixedDepth')
+    print('Fixed depth total: %d nodes in %.2f s, %.0f nodes/s' % (nodes,seconds,nodes/max(seconds,1e-9)))
+    if args.workers>1:
+        results['speedup'] = runSpeedup(loadEPD(args.positions),args.depth,args.workers)
+    saveResults(results)
+    if args.save_baseline:
+        with open(args.baseline,'w') as file_handle:
+            json.dump(results,file_handle,indent=1)
+    elif os.path.exists(args.baseline):
+        compareResults(results,loadResults(args.baseline))
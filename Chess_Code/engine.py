@@ -0,0 +1,2557 @@
+"""
+engine.py - The chess engine behind chess.py: the rules of the game, the search and the
+evaluation. It doesn't use pygame, so it can be imported on its own, e.g. to let the AI
+play or to test it without opening a window.
+"""
+import random 
+from collections import defaultdict 
+import os 
+import time
+import multiprocessing
+import mmap
+import struct
+import json
+
+#Seconds the AI may spend on each move. To play the AI with a clock instead, set
+#AI_CLOCK to its total time for the game and AI_INCREMENT to the seconds it gains per move.
+MOVE_TIME = 5.0
+AI_CLOCK = None
+AI_INCREMENT = 0
+#Maximum depth of recursion tree (the time budget normally stops the search first):
+DEPTH = 20
+#Let the AI think about its next move during the human's turn (see predictReply()):
+PONDER = True
+#Number of processes searching the AI's move together (see iterativeDeepening()). A parallel
+#search is opt-in, e.g. multiprocessing.cpu_count(): the helpers are forked from the thread of
+#the search on every move, and take all the cores while pondering in the human's turn:
+SEARCH_WORKERS = 1
+#Memory budget of the transposition table in megabytes, and the rough size of one entry:
+TT_SIZE_MB = 32
+TT_ENTRY_BYTES = 300
+#Number of entries of the pawn structure table (see PawnTable), a power of two:
+PAWN_TABLE_ENTRIES = 1 << 14
+#Deepest ply the search can reach (sizes the killer move table):
+MAX_PLY = 64
+#Score of being checkmated at the root. Mate in n plies scores MATE_SCORE-n, and scores beyond
+#MATE_BOUND are mates. The bound leaves room for the longest tablebase mate (67 plies in KBNK)
+#found at the deepest ply of the search:
+MATE_SCORE = 20000
+MATE_BOUND = MATE_SCORE - 256
+#Move ordering: the hash move comes first, then captures (most valuable victim first,
+#least valuable attacker first among those), then killer moves, then quiet moves by history:
+HASH_MOVE_SCORE = 1000000
+CAPTURE_SCORE = 100000
+KILLER_SCORE = 90000
+MVV_LVA_ORDER = {'P': 1, 'N': 2, 'B': 3, 'R': 4, 'Q': 5, 'K': 6}
+#Material value of each piece, and the safety margin of delta pruning in quiescence():
+PIECE_VALUES = {'P': 100, 'N': 320, 'B': 330, 'R': 500, 'Q': 900, 'K': 0}
+DELTA_MARGIN = 200
+#Material counted in pawns, used by evaluate() to tell the opening from the ending:
+PHASE_MATERIAL = {'P': 1, 'N': 3, 'B': 3, 'R': 5, 'Q': 9, 'K': 0}
+#Null move pruning: the side to move passes, and if a search reduced by NULL_MOVE_REDUCTION
+#plies still fails high, so would any real move. Only at depth NULL_MOVE_MIN_DEPTH or more:
+NULL_MOVE = True
+NULL_MOVE_REDUCTION = 2
+NULL_MOVE_MIN_DEPTH = 3
+#Late move reductions: quiet moves ordered after the first LMR_MOVES are searched one ply
+#shallower (two after twice as many), and again at full depth if they beat alpha:
+LATE_MOVE_REDUCTIONS = True
+LMR_MOVES = 3
+LMR_MIN_DEPTH = 3
+#Aspiration windows: from depth ASPIRATION_MIN_DEPTH, each iteration first searches a window of
+#ASPIRATION_WINDOW either side of the last score, widened four times over each time it fails:
+ASPIRATION_WINDOW = 50
+ASPIRATION_MIN_DEPTH = 3
+#Kinds of values stored in the transposition table:
+EXACT = 0
+LOWERBOUND = 1
+UPPERBOUND = 2
+#File of the opening book (see OpeningBook), and the layout of its records: the key of the
+#position, the move and its weight, big-endian:
+OPENING_BOOK = os.path.join(os.path.dirname(os.path.abspath(__file__)),'openingBook.bin')
+BOOK_RECORD = struct.Struct('>QHH')
+BOOK_MAX_WEIGHT = 0xFFFF
+#Directory of the endgame tablebases (see probeTablebase()):
+TABLEBASE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),'tablebases')
+#Write the statistics of every move of the AI to SEARCH_LOG, one JSON record per line, with
+#the time spent in move generation, evaluation and the transposition table (see logSearch()):
+SEARCH_STATS = False
+SEARCH_LOG = os.path.join(os.path.dirname(os.path.abspath(__file__)),'search_log.jsonl')
+#Beta cutoffs are counted by the index of the move that caused them, up to this many:
+CUTOFF_INDEXES = 64
+
+
+###################### Class Definitions ######################
+
+class GamePosition:
+    """
+    GamePosition - This class stores a chess position. A chess position constitutes several
+    features that specify the state of the game, such as the the player that has to play next,
+    castling rights of the players, number of irreversible moves played so far, the positions of
+    pieces on the board, etc.
+    """
+
+    def __init__(self,board,player,castling_rights,EnP_Target,HMC,history = None):
+        self.board = board 
+
+        self.player = player
+
+        self.castling = castling_rights
+
+        self.EnP = EnP_Target
+
+        self.HMC = HMC
+
+        #Zobrist keys of the earlier positions of the game, oldest first. makemove() pushes
+        #the key of the position it leaves, so repetitions can be found (see repetitions()):
+        if history is None:
+            history = []
+        self.history = history
+        #Moves of the game played before this position, which evaluate() uses to tell the
+        #ending. Unlike the history, it doesn't grow as the search makes moves, so that a
+        #position is evaluated the same at any depth; iterativeDeepening() sets it at the root:
+        self.gamePlies = len(history)
+
+        #Bitboards (one 64 bit mask per piece type and color, and one per color) that
+        #mirror the board. They are kept in sync by placePiece() and removePiece():
+        self.bitboards, self.occupancy = board2bitboards(board)
+
+        #64 bit Zobrist key of the position, updated incrementally as moves are made, and the
+        #key of its pawns alone (see PawnTable):
+        self.key = zobristKey(self)
+        self.pawnKey = pawnZobristKey(self)
+
+        #Material and piece square table scores (see evaluate()), also updated incrementally:
+        self.openingScore, self.endgameScore, self.material = evaluationScores(self)
+
+        #Every move made with makemove() pushes what is needed to take it back here:
+        self.undoStack = []
+
+    def getboard(self):
+        return self.board
+    def setboard(self,board):
+        self.board = board
+    def getplayer(self):
+        return self.player
+    def setplayer(self,player):
+        self.player = player
+    def getCastleRights(self):
+        return self.castling
+    def setCastleRights(self,castling_rights):
+        self.castling = castling_rights
+    def getEnP(self):
+        return self.EnP
+    def setEnP(self, EnP_Target):
+        self.EnP = EnP_Target
+    def getHMC(self):
+        return self.HMC
+    def setHMC(self,HMC):
+        self.HMC = HMC
+    def getbitboards(self):
+        return self.bitboards
+    def getoccupancy(self):
+        return self.occupancy
+
+    def placePiece(self,sq,piece):
+        """
+        Puts a piece (eg 'Nw') on an empty square, updating both the board and the bitboards.
+        """
+        bit = 1 << sq
+        self.board[sq>>3][sq&7] = piece
+        self.bitboards[piece] |= bit
+        self.occupancy[piece[1]] |= bit
+        self.key ^= ZOBRIST_PIECES[piece][sq]
+        if piece[0] == 'P':
+            self.pawnKey ^= ZOBRIST_PIECES[piece][sq]
+        self.openingScore += OPENING_SCORES[piece][sq]
+        self.endgameScore += ENDGAME_SCORES[piece][sq]
+        self.material[piece[1]] += PHASE_MATERIAL[piece[0]]
+
+    def removePiece(self,sq):
+        """
+        Removes the piece standing on a square and returns it.
+        """
+        piece = self.board[sq>>3][sq&7]
+        bit = 1 << sq
+        self.board[sq>>3][sq&7] = 0
+        self.bitboards[piece] ^= bit
+        self.occupancy[piece[1]] ^= bit
+        self.key ^= ZOBRIST_PIECES[piece][sq]
+        if piece[0] == 'P':
+            self.pawnKey ^= ZOBRIST_PIECES[piece][sq]
+        self.openingScore -= OPENING_SCORES[piece][sq]
+        self.endgameScore -= ENDGAME_SCORES[piece][sq]
+        self.material[piece[1]] -= PHASE_MATERIAL[piece[0]]
+        return piece
+
+    def enpassantKey(self):
+        """
+        Returns the part of the Zobrist key that comes from the en passant target. It only
+        counts when a pawn of the side to move can actually capture there, so that positions
+        which differ only by an unusable target share a key.
+        """
+        if self.EnP == -1:
+            return 0
+        x,y = self.EnP
+        color = 'wb'[self.player]
+        #The capturing pawns stand where a pawn of the other color on the target would attack:
+        if PAWN_ATTACKS[opp(color)][y*8 + x] & self.bitboards['P'+color]:
+            return ZOBRIST_ENP[x]
+        return 0
+
+    def repetitions(self):
+        """
+        Returns how many times the current position occurred before in this game. Only the
+        positions since the last capture or pawn move (the half move clock) can be the same,
+        and only every other one has the same player to move, so few keys are compared.
+        """
+        history = self.history
+        count = 0
+        for i in range(len(history)-2,len(history)-1-min(self.HMC,len(history)),-2):
+            if history[i] == self.key:
+                count += 1
+        return count
+
+    def checkRepition(self):
+        """
+        Returns True if the current position occurred at least twice before in this game,
+        which makes it a draw by threefold repetition.
+        """
+        return self.repetitions()>=2
+
+    def gethistory(self):
+        return self.history
+    
+    def clone(self):
+        """
+        This method returns another instance of the current object with exactly the same
+        parameters but independent of the current object.
+        """
+        clone = GamePosition([row[:] for row in self.board], #Independent copy
+                             self.player,
+                             [self.castling[0][:],self.castling[1][:]], #Independent copy
+                             self.EnP,
+                             self.HMC,
+                             self.history[:])
+        return clone
+
+    def makemove(self,x,y,x2,y2,promotion='Q'):
+        """
+        makemove(x,y,x2,y2,promotion) - Makes a move in place. (x,y) are coordinates of the piece to
+        be moved, and (x2,y2) are coordinates of the destination. The move is assumed to be valid.
+        A pawn reaching the last rank becomes the piece named by promotion (a queen by default).
+        Everything needed to take the move back is pushed on the undo stack, so that
+        unmakemove() can restore the position exactly without copying it.
+        """
+        board = self.board
+        piece = board[y][x]
+        kind = piece[0]
+        color = piece[1]
+        sq = y*8 + x
+        sq2 = y2*8 + x2
+        captured = board[y2][x2]
+        captured_sq = sq2
+        castling_rights = self.castling
+        EnP_Target = self.EnP
+        #An en passant capture takes a pawn that is not on the destination square:
+        if kind == 'P' and EnP_Target == (x2,y2):
+            if color == 'w':
+                captured_sq = sq2 + 8
+            else:
+                captured_sq = sq2 - 8
+            captured = board[captured_sq>>3][captured_sq&7]
+        self.undoStack.append((sq,sq2,piece,captured,captured_sq,
+                               castling_rights,EnP_Target,self.HMC,self.key))
+        self.history.append(self.key)
+        #The old en passant target is about to expire:
+        self.key ^= self.enpassantKey()
+
+        #Update the half move clock:
+        if captured!=0 or kind=='P':
+            #Either a capture was made or a pawn has moved:
+            self.HMC = 0
+        else:
+            self.HMC += 1
+
+        #Make the move:
+        if captured!=0:
+            self.removePiece(captured_sq)
+        self.removePiece(sq)
+        if kind == 'P' and (y2==0 or y2==7):
+            #Promotion:
+            self.placePiece(sq2,promotion+color)
+        else:
+            self.placePiece(sq2,piece)
+
+        #If castling occured, place the rook at the appropriate location:
+        if kind == 'K' and abs(x2-x) == 2:
+            if x2>x:
+                self.placePiece(y*8+5,self.removePiece(y*8+7))
+            else:
+                self.placePiece(y*8+3,self.removePiece(y*8))
+
+        #Castling rights are lost when the king or a rook leaves its initial square or
+        #a rook is captured on it. The rights are copied before being changed, so that
+        #the undo stack can keep a reference to the old ones:
+        if kind == 'K' or sq in CASTLING_SQUARES or sq2 in CASTLING_SQUARES:
+            castling_rights = [castling_rights[0][:],castling_rights[1][:]]
+            if kind == 'K':
+                castling_rights[0 if color=='w' else 1] = [False,False]
+            for corner in (sq,sq2):
+                if corner in CASTLING_SQUARES:
+                    side,right = CASTLING_SQUARES[corner]
+                    castling_rights[side][right] = False
+            self.key ^= castlingKey(self.castling) ^ castlingKey(castling_rights)
+            self.castling = castling_rights
+
+        #A pawn that moves two squares can be captured en passant on the next move:
+        if kind == 'P' and abs(y2-y)==2:
+            self.EnP = (x,(y+y2)//2)
+        else:
+            self.EnP = -1
+
+        self.player = 1 - self.player
+        self.key ^= ZOBRIST_BLACK ^ self.enpassantKey()
+
+    def makenullmove(self):
+        """
+        makenullmove() - Passes the turn to the other player without moving (see null move
+        pruning in negamax()). It is taken back with unmakemove() like any other move. The half
+        move clock restarts, as no repetition can go back past a null move.
+        """
+        self.undoStack.append((None,None,None,0,None,self.castling,self.EnP,self.HMC,self.key))
+        self.history.append(self.key)
+        self.key ^= self.enpassantKey()
+        self.EnP = -1
+        self.HMC = 0
+        self.player = 1 - self.player
+        self.key ^= ZOBRIST_BLACK
+
+    def unmakemove(self):
+        """
+        unmakemove() - Takes back the last move made with makemove() (or makenullmove()),
+        restoring the captured piece, castling rights, en passant target and half move clock.
+        """
+        (sq,sq2,piece,captured,captured_sq,
+         castling_rights,EnP_Target,HMC,key) = self.undoStack.pop()
+        if sq is None:
+            #A null move:
+            self.EnP = EnP_Target
+            self.HMC = HMC
+            self.player = 1 - self.player
+            self.key = key
+            self.history.pop()
+            return
+        #Put the piece back (the piece on sq2 may be a promoted one):
+        self.removePiece(sq2)
+        self.placePiece(sq,piece)
+        if captured!=0:
+            self.placePiece(captured_sq,captured)
+        #Undo the rook move of castling:
+        if piece[0] == 'K' and abs(sq2-sq) == 2:
+            if sq2>sq:
+                self.placePiece(sq+3,self.removePiece(sq+1))
+            else:
+                self.placePiece(sq-4,self.removePiece(sq-1))
+        self.castling = castling_rights
+        self.EnP = EnP_Target
+        self.HMC = HMC
+        self.player = 1 - self.player
+        #The key was changed by the piece movements above, restore it as it was:
+        self.key = key
+        self.history.pop()
+
+
+class PawnTable:
+    """
+    PawnTable - Caches the pawn structure terms of evaluate(), keyed by the Zobrist key of the
+    pawns alone (see pawnStructure()). Pawns move much less often than the other pieces, so
+    most positions searched share their pawn structure with many others and find it here.
+    The table has a fixed number of slots, and a new entry always replaces the old one in
+    its slot.
+    """
+
+    def __init__(self,entries=PAWN_TABLE_ENTRIES):
+        self.mask = entries - 1
+        self.clear()
+
+    def clear(self):
+        self.slots = [None]*(self.mask+1)
+
+    def probe(self,pawnKey):
+        """
+        Returns the entry (pawnKey,score,passed) stored for these pawns, or None.
+        """
+        entry = self.slots[pawnKey & self.mask]
+        if entry is not None and entry[0] == pawnKey:
+            return entry
+        return None
+
+    def store(self,pawnKey,score,passed):
+        self.slots[pawnKey & self.mask] = (pawnKey,score,passed)
+
+
+class SearchTimeout(Exception):
+    """
+    Raised inside negamax() when the time given to the AI for its move has run out.
+    """
+    pass
+
+
+class TranspositionTable:
+    """
+    TranspositionTable - Stores the result of every node searched by negamax(), so that the same
+    position reached through a different order of moves is not searched again, and so that the
+    best move found last time can be tried first. Each entry holds the key of the position, the
+    depth it was searched to, the value found, whether that value is exact or only a lower/upper
+    bound (because of an alpha-beta cutoff), the best move and the search (age) it comes from.
+
+    The table has a fixed number of buckets chosen from a memory budget. Each bucket has two
+    slots: a depth-preferred slot that keeps the deepest (most expensive) result, unless it is
+    from an older search, and an always-replace slot that takes everything else.
+    """
+
+    def __init__(self,size_mb=TT_SIZE_MB):
+        self.resize(size_mb)
+
+    def resize(self,size_mb):
+        #Number of buckets, rounded down to a power of two so a bucket is found with a mask:
+        buckets = max(1,size_mb*1024*1024//(2*TT_ENTRY_BYTES))
+        self.mask = (1 << (buckets.bit_length()-1)) - 1
+        self.clear()
+
+    def clear(self):
+        self.slots = [None]*(2*(self.mask+1))
+        self.age = 0
+
+    def newSearch(self):
+        """
+        Called at the start of every search. Entries of older searches may be replaced first.
+        """
+        self.age += 1
+
+    def probe(self,key):
+        """
+        Returns the entry (key,depth,flag,value,move,age) stored for this key, or None.
+        """
+        index = (key & self.mask)*2
+        entry = self.slots[index]
+        if entry is not None and entry[0] == key:
+            return entry
+        entry = self.slots[index+1]
+        if entry is not None and entry[0] == key:
+            return entry
+        return None
+
+    def store(self,key,depth,flag,value,move):
+        index = (key & self.mask)*2
+        entry = (key,depth,flag,value,move,self.age)
+        old = self.slots[index]
+        if (old is None or old[0] == key or depth >= old[1] or old[5] != self.age):
+            self.slots[index] = entry
+        else:
+            self.slots[index+1] = entry
+
+
+class SharedTranspositionTable(TranspositionTable):
+    """
+    SharedTranspositionTable - Same as TranspositionTable, but kept in shared memory so that all
+    the processes of a parallel search read and write the same table (see iterativeDeepening()).
+    Each entry is packed into two 64 bit words: the key XORed with the data, and the data. Writes
+    are not locked; if two processes write a slot at the same time, its first word no longer XORs
+    back to the key, so the torn entry simply reads as a miss.
+    """
+
+    def resize(self,size_mb):
+        #Each bucket holds two slots of two words:
+        buckets = max(1,size_mb*1024*1024//32)
+        self.mask = (1 << (buckets.bit_length()-1)) - 1
+        self.clear()
+
+    def clear(self):
+        self.words = multiprocessing.RawArray('Q',4*(self.mask+1))
+        self.age = 0
+
+    def probe(self,key):
+        index = (key & self.mask)*4
+        words = self.words
+        for slot in (index,index+2):
+            data = words[slot+1]
+            if data and words[slot] ^ data == key:
+                #Unpack: value (16 bits), depth (8), flag (2), move (from 6, to 6, present 1), age (8)
+                move = None
+                if data >> 38 & 1:
+                    sq = data >> 26 & 63
+                    sq2 = data >> 32 & 63
+                    move = [(sq&7,sq>>3),(sq2&7,sq2>>3)]
+                return (key,data >> 16 & 255,data >> 24 & 3,(data & 0xFFFF) - 32768,move,
+                        data >> 39 & 255)
+        return None
+
+    def store(self,key,depth,flag,value,move):
+        index = (key & self.mask)*4
+        words = self.words
+        data = (max(-32767,min(32767,value)) + 32768) | depth << 16 | flag << 24 | (self.age & 255) << 39
+        if move is not None:
+            (x,y),(x2,y2) = move
+            data |= (y*8+x) << 26 | (y2*8+x2) << 32 | 1 << 38
+        old = words[index+1]
+        if (old == 0 or words[index] ^ old == key or depth >= old >> 16 & 255 or
+            old >> 39 & 255 != self.age & 255):
+            words[index] = key ^ data
+            words[index+1] = data
+        else:
+            words[index+2] = key ^ data
+            words[index+3] = data
+
+
+class OpeningBook:
+    """
+    OpeningBook - The moves played in known opening positions, and how often each one was played
+    (its weight). The book is a file of fixed-width records (key, move, weight), like a Polyglot
+    book, sorted by the Zobrist key of the position. The file is memory mapped instead of being
+    read, and the moves of a position are found by binary search, so opening a book takes the
+    same short time and little memory however many positions it holds. See writeBook().
+    """
+
+    def __init__(self,filename=None):
+        self.file_handle = None
+        self.data = b''
+        self.count = 0
+        if filename is not None and os.path.exists(filename) and os.path.getsize(filename)>0:
+            self.file_handle = open(filename,'rb')
+            self.data = mmap.mmap(self.file_handle.fileno(),0,access=mmap.ACCESS_READ)
+            self.count = len(self.data)//BOOK_RECORD.size
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self,key):
+        return self.find(key)<self.count
+
+    def close(self):
+        if self.file_handle is not None:
+            self.data.close()
+            self.file_handle.close()
+        self.file_handle = None
+        self.data = b''
+        self.count = 0
+
+    def find(self,key):
+        """
+        Returns the index of the first record of the position with this key, or self.count if
+        it is not in the book.
+        """
+        low = 0
+        high = self.count
+        while low<high:
+            middle = (low+high)//2
+            if BOOK_RECORD.unpack_from(self.data,middle*BOOK_RECORD.size)[0]<key:
+                low = middle+1
+            else:
+                high = middle
+        if low<self.count and BOOK_RECORD.unpack_from(self.data,low*BOOK_RECORD.size)[0]==key:
+            return low
+        return self.count
+
+    def moves(self,key):
+        """
+        Returns the moves of the position with this key, as a list of (move,weight) with the
+        most played move first.
+        """
+        moves = []
+        for index in range(self.find(key),self.count):
+            recordKey,code,weight = BOOK_RECORD.unpack_from(self.data,index*BOOK_RECORD.size)
+            if recordKey!=key:
+                break
+            moves.append((decodeBookMove(code),weight))
+        return moves
+
+    def entries(self):
+        """
+        Returns the whole book as a dictionary of {key: [(move,weight),...]}.
+        """
+        entries = defaultdict(list)
+        for index in range(self.count):
+            key,code,weight = BOOK_RECORD.unpack_from(self.data,index*BOOK_RECORD.size)
+            entries[key].append((decodeBookMove(code),weight))
+        return entries
+
+
+#///////////////////////////////BITBOARDS/////////////////////////////////////
+
+#Squares are numbered from 0 to 63 as y*8+x, so square 0 is a8 (board[0][0]) and
+#square 63 is h1 (board[7][7]). A bitboard is an integer whose bit n is set if square
+#n is part of the set it describes (eg all the white knights, or all attacked squares).
+
+def makeStepTable(steps):
+    """
+    makeStepTable(steps) - Precomputes, for each of the 64 squares, the bitboard of the
+    squares reached by taking one of the (dx,dy) steps. Used for knights, kings and pawn
+    captures, which can never be blocked.
+    """
+    table = []
+    for sq in range(64):
+        x = sq%8
+        y = sq//8
+        mask = 0
+        for dx,dy in steps:
+            if 0<=x+dx<=7 and 0<=y+dy<=7:
+                mask |= 1 << ((y+dy)*8 + x+dx)
+        table.append(mask)
+    return table
+
+
+def makeRayTable(dx,dy):
+    """
+    makeRayTable(dx,dy) - Precomputes, for each of the 64 squares, the bitboard of all the
+    squares on an empty board that a slider standing there sees in the direction (dx,dy).
+    """
+    table = []
+    for sq in range(64):
+        x = sq%8 + dx
+        y = sq//8 + dy
+        mask = 0
+        while 0<=x<=7 and 0<=y<=7:
+            mask |= 1 << (y*8 + x)
+            x += dx
+            y += dy
+        table.append(mask)
+    return table
+
+
+KNIGHT_ATTACKS = makeStepTable([(1,2),(2,1),(2,-1),(1,-2),(-1,-2),(-2,-1),(-2,1),(-1,2)])
+KING_ATTACKS = makeStepTable([(1,1),(1,0),(1,-1),(0,-1),(-1,-1),(-1,0),(-1,1),(0,1)])
+#Squares attacked by a pawn of each color standing on a square:
+PAWN_ATTACKS = {'w': makeStepTable([(-1,-1),(1,-1)]),
+                'b': makeStepTable([(-1,1),(1,1)])}
+
+#Each ray is stored with a flag telling whether square numbers increase along it. The
+#first blocker on such a ray is its lowest set bit, otherwise it is its highest set bit.
+ROOK_RAYS = [(makeRayTable(dx,dy), dy>0 or (dy==0 and dx>0))
+             for dx,dy in [(0,-1),(0,1),(-1,0),(1,0)]]
+BISHOP_RAYS = [(makeRayTable(dx,dy), dy>0 or (dy==0 and dx>0))
+               for dx,dy in [(-1,-1),(1,-1),(-1,1),(1,1)]]
+
+#Squares seen from each square by a rook or a bishop on an empty board:
+ROOK_MASKS = [sum(table[sq] for table,increasing in ROOK_RAYS) for sq in range(64)]
+BISHOP_MASKS = [sum(table[sq] for table,increasing in BISHOP_RAYS) for sq in range(64)]
+
+#Ranks that a pawn of each color reaches after a single push from its initial square:
+RANK_3 = 0xFF << 40
+RANK_6 = 0xFF << 16
+
+#Squares on which pawns of each color promote:
+PROMOTION_RANK = {'w': 0xFF, 'b': 0xFF << 56}
+
+#Squares that must be free of enemy pawns for a pawn of each color on a square to be passed:
+#those in front of it on its own file and on both neighbouring files:
+PASSED_MASKS = {'w': [sum(1 << (y*8 + x) for y in range(sq//8) for x in range(sq%8-1,sq%8+2)
+                          if 0<=x<=7) for sq in range(64)],
+                'b': [sum(1 << (y*8 + x) for y in range(sq//8+1,8) for x in range(sq%8-1,sq%8+2)
+                          if 0<=x<=7) for sq in range(64)]}
+
+#Initial rook squares, with the [player][side] index of the castling right they carry:
+CASTLING_SQUARES = {63: (0,0), 56: (0,1), 7: (1,0), 0: (1,1)}
+
+
+def board2bitboards(board):
+    """
+    board2bitboards(board) - Builds the bitboards of a 2D board array. Returns a dictionary
+    with one bitboard per piece ('Pw', 'Kb', etc.) and a dictionary with one per color.
+    """
+    bitboards = dict((kind+color,0) for kind in 'PNBRQK' for color in 'wb')
+    occupancy = {'w': 0, 'b': 0}
+    for y in range(8):
+        for x in range(8):
+            piece = board[y][x]
+            if piece!=0:
+                bit = 1 << (y*8 + x)
+                bitboards[piece] |= bit
+                occupancy[piece[1]] |= bit
+    return bitboards,occupancy
+
+
+def bitsof(bitboard):
+    """
+    bitsof(bitboard) - Yields the squares of all the set bits of a bitboard, lowest first.
+    """
+    while bitboard:
+        lowest = bitboard & -bitboard
+        yield lowest.bit_length() - 1
+        bitboard ^= lowest
+
+
+def slidingAttacks(sq,occupied,rays):
+    """
+    slidingAttacks(sq,occupied,rays) - Returns the squares seen by a slider on sq along
+    the given rays. Each ray is cut right after the first occupied square on it.
+    """
+    attacks = 0
+    for table,increasing in rays:
+        ray = table[sq]
+        blockers = ray & occupied
+        if blockers:
+            if increasing:
+                first = (blockers & -blockers).bit_length() - 1
+            else:
+                first = blockers.bit_length() - 1
+            #Everything behind the blocker is hidden:
+            ray ^= table[first]
+        attacks |= ray
+    return attacks
+
+
+def rookAttacks(sq,occupied):
+    return slidingAttacks(sq,occupied,ROOK_RAYS)
+
+
+def bishopAttacks(sq,occupied):
+    return slidingAttacks(sq,occupied,BISHOP_RAYS)
+
+
+def pieceAttacks(piece,sq,occupied):
+    """
+    pieceAttacks(piece,sq,occupied) - Returns the bitboard of squares attacked by a piece
+    (eg 'Qw') standing on sq, given the bitboard of all occupied squares.
+    """
+    kind = piece[0]
+    if kind == 'P':
+        return PAWN_ATTACKS[piece[1]][sq]
+    if kind == 'N':
+        return KNIGHT_ATTACKS[sq]
+    if kind == 'B':
+        return bishopAttacks(sq,occupied)
+    if kind == 'R':
+        return rookAttacks(sq,occupied)
+    if kind == 'Q':
+        return rookAttacks(sq,occupied) | bishopAttacks(sq,occupied)
+    return KING_ATTACKS[sq]
+
+
+def attackedSquares(position,color):
+    """
+    attackedSquares(position,color) - Returns the bitboard of all squares attacked by
+    the pieces of the given color.
+    """
+    color = color[0]
+    bitboards = position.bitboards
+    occupied = position.occupancy['w'] | position.occupancy['b']
+    attacks = 0
+    for sq in bitsof(bitboards['P'+color]):
+        attacks |= PAWN_ATTACKS[color][sq]
+    for sq in bitsof(bitboards['N'+color]):
+        attacks |= KNIGHT_ATTACKS[sq]
+    for sq in bitsof(bitboards['B'+color] | bitboards['Q'+color]):
+        attacks |= bishopAttacks(sq,occupied)
+    for sq in bitsof(bitboards['R'+color] | bitboards['Q'+color]):
+        attacks |= rookAttacks(sq,occupied)
+    for sq in bitsof(bitboards['K'+color]):
+        attacks |= KING_ATTACKS[sq]
+    return attacks
+
+
+def pseudoLegalTargets(position,sq):
+    """
+    pseudoLegalTargets(position,sq) - Returns the bitboard of squares the piece on sq
+    may move to, including captures and castling, but without checking whether the move
+    leaves its own king under attack.
+    """
+    board = position.board
+    piece = board[sq>>3][sq&7]
+    kind = piece[0]
+    color = piece[1]
+    enemy = opp(color)
+    own = position.occupancy[color]
+    enemies = position.occupancy[enemy]
+    occupied = own | enemies
+
+    if kind == 'P':
+        bit = 1 << sq
+        EnP_Target = position.getEnP()
+        if EnP_Target!=-1:
+            #The en passant square counts as an enemy for pawn captures:
+            enemies |= 1 << (EnP_Target[1]*8 + EnP_Target[0])
+        targets = PAWN_ATTACKS[color][sq] & enemies
+        if color == 'w':
+            single = (bit >> 8) & ~occupied
+            double = ((single & RANK_3) >> 8) & ~occupied
+        else:
+            single = (bit << 8) & ~occupied
+            double = ((single & RANK_6) << 8) & ~occupied
+        return targets | single | double
+
+    targets = pieceAttacks(piece,sq,occupied) & ~own
+
+    if kind == 'K':
+        #Kings can potentially castle:
+        player = 0 if color == 'w' else 1
+        right = position.getCastleRights()[player]
+        x = sq&7
+        y = sq>>3
+        if (right[0] or right[1]) and x == 4 and (y == 7) == (color == 'w'):
+            #Kingside: the rook is in place, the squares in between are empty and
+            #neither the king nor the squares it passes through are attacked.
+            if (right[0] and
+                board[y][7] == 'R'+color and
+                not occupied & (3 << (sq+1)) and
+                not isAttackedby(position,4,y,enemy) and
+                not isAttackedby(position,5,y,enemy) and
+                not isAttackedby(position,6,y,enemy)):
+                targets |= 1 << (sq+2)
+            #Queenside:
+            if (right[1] and
+                board[y][0] == 'R'+color and
+                not occupied & (7 << (sq-3)) and
+                not isAttackedby(position,4,y,enemy) and
+                not isAttackedby(position,3,y,enemy) and
+                not isAttackedby(position,2,y,enemy)):
+                targets |= 1 << (sq-2)
+    return targets
+
+
+#///////////////////////////////ZOBRIST HASHING///////////////////////////////
+
+#A Zobrist key is the XOR of one random 64 bit number per (piece,square) on the board,
+#one per castling right still available, one for the file of a usable en passant target
+#and one if black is to move. Making a move only XORs the numbers that changed in or out.
+#The generator is seeded so that keys stay the same between runs (the opening book
+#relies on this).
+zobrist_random = random.Random(20221120)
+ZOBRIST_PIECES = dict((kind+color,[zobrist_random.getrandbits(64) for sq in range(64)])
+                      for kind in 'PNBRQK' for color in 'wb')
+ZOBRIST_CASTLING = [[zobrist_random.getrandbits(64) for right in range(2)]
+                    for player in range(2)]
+ZOBRIST_ENP = [zobrist_random.getrandbits(64) for x in range(8)]
+ZOBRIST_BLACK = zobrist_random.getrandbits(64)
+
+
+def castlingKey(castling_rights):
+    """
+    castlingKey(castling_rights) - Returns the part of the Zobrist key that comes from
+    the castling rights.
+    """
+    key = 0
+    for player in range(2):
+        for right in range(2):
+            if castling_rights[player][right]:
+                key ^= ZOBRIST_CASTLING[player][right]
+    return key
+
+
+def zobristKey(position):
+    """
+    zobristKey(position) - Computes the Zobrist key of a position from scratch. During play
+    and search the key is instead kept up to date by makemove() and unmakemove().
+    """
+    key = 0
+    for piece,bitboard in position.bitboards.items():
+        for sq in bitsof(bitboard):
+            key ^= ZOBRIST_PIECES[piece][sq]
+    key ^= castlingKey(position.getCastleRights())
+    key ^= position.enpassantKey()
+    if position.getplayer() == 1:
+        key ^= ZOBRIST_BLACK
+    return key
+
+
+def pawnZobristKey(position):
+    """
+    pawnZobristKey(position) - Computes the Zobrist key of the pawns of a position alone, from
+    scratch. It is the part of the full key that comes from the pawns.
+    """
+    key = 0
+    for piece in ('Pw','Pb'):
+        for sq in bitsof(position.bitboards[piece]):
+            key ^= ZOBRIST_PIECES[piece][sq]
+    return key
+
+
+#///////////////////////////////ENDGAME TABLEBASES////////////////////////////
+#A tablebase holds the result of every position of an ending with a king and a few pieces
+#against a lone king, as computed by maketablebase.py: one byte per position, 0 if it is a draw,
+#otherwise 1 + the number of plies to mate with best play. An odd number of plies means the side
+#to move mates, an even one that it gets mated. Endings are named by the pieces of the stronger
+#side, then of the other, and are stored with the stronger side as white.
+TABLEBASE_ENDINGS = ('KQK','KRK','KPK','KBNK')
+#Most pieces (kings included) in any of these endings:
+TABLEBASE_PIECES = 4
+
+#Without pawns, the board can be mirrored and turned so that the white king stands in the
+#triangle a1-d1-d4. Its 10 squares get the numbers 0-9:
+TRIANGLE_SQUARES = [y*8 + x for y in range(7,3,-1) for x in range(8) if 7-y <= x <= 3]
+TRIANGLE_INDEX = [-1]*64
+for i,sq in enumerate(TRIANGLE_SQUARES):
+    TRIANGLE_INDEX[sq] = i
+
+
+def tablebaseSize(ending):
+    """
+    tablebaseSize(ending) - Returns the number of positions in the tablebase of an ending.
+    """
+    kings = 32 if 'P' in ending else 10
+    #The white king, then 64 squares for the black king and for each other piece:
+    return kings * 64**(len(ending)-1) * 2
+
+
+def tablebaseIndex(pawns,player,wk,bk,pieces):
+    """
+    tablebaseIndex(pawns,player,wk,bk,pieces) - Returns the index in a tablebase of the position
+    with the given player to move, the white king on wk, the black king on bk and the other white
+    pieces on the squares listed in pieces (in the order of the ending's name). pawns tells
+    whether the ending has pawns, which can't be mirrored vertically or turned.
+    """
+    flip = 0
+    if wk & 7 > 3:
+        flip = 7
+    if not pawns and wk >> 3 < 4:
+        flip |= 56
+    squares = [sq ^ flip for sq in [wk,bk] + list(pieces)]
+    if pawns:
+        index = (squares[0] >> 3)*4 + (squares[0] & 7)
+    else:
+        #Mirror along the a1-h8 diagonal if the white king is above it, or if it is on it and
+        #so is every piece before the first one above it:
+        for sq in squares:
+            if 7 - (sq >> 3) != sq & 7:
+                break
+        if 7 - (sq >> 3) > sq & 7:
+            squares = [(7 - (sq & 7))*8 + 7 - (sq >> 3) for sq in squares]
+        index = TRIANGLE_INDEX[squares[0]]
+    for sq in squares[1:]:
+        index = index*64 + sq
+    return index*2 + player
+
+
+def loadTablebases(directory=TABLEBASE_DIR):
+    """
+    loadTablebases(directory) - Memory maps the tablebase files found in the directory, so that
+    the search can probe them. Returns the names of the endings found.
+    """
+    for ending in TABLEBASE_ENDINGS:
+        filename = os.path.join(directory,ending+'.bin')
+        if ending not in tablebases and os.path.exists(filename):
+            with open(filename,'rb') as file_handle:
+                tablebases[ending] = mmap.mmap(file_handle.fileno(),0,access=mmap.ACCESS_READ)
+    return sorted(tablebases)
+
+
+def probeTablebase(position):
+    """
+    probeTablebase(position) - Looks up a position in the tablebases. Returns the number of plies
+    to mate (odd if the side to move mates, even if it gets mated), -1 for a draw (including
+    positions where no side has enough material left to mate), or None if the position's ending
+    has no tablebase.
+    """
+    bitboards = position.bitboards
+    material = {}
+    for color in 'wb':
+        material[color] = ''.join(kind*bin(bitboards[kind+color]).count('1') for kind in 'QRBNP')
+    if material['w'] and material['b']:
+        return None
+    strong = 'w' if material['w'] else 'b'
+    if material[strong] in ('','B','N'):
+        return -1
+    ending = 'K' + material[strong] + 'K'
+    if ending not in tablebases:
+        return None
+    #Store the position with the stronger side as white, mirroring it if needed:
+    flip = 0 if strong=='w' else 56
+    player = position.player if strong=='w' else 1 - position.player
+    squares = []
+    for kind in ending[1:-1]:
+        for sq in bitsof(bitboards[kind+strong]):
+            squares.append(sq ^ flip)
+    wk = (bitboards['K'+strong].bit_length() - 1) ^ flip
+    bk = (bitboards['K'+opp(strong)].bit_length() - 1) ^ flip
+    value = tablebases[ending][tablebaseIndex('P' in ending,player,wk,bk,squares)]
+    return value - 1 if value else -1
+
+
+def tablebaseScore(position,ply):
+    """
+    tablebaseScore(position,ply) - Returns the value of a position found in the tablebases, for
+    the side to move, as negamax() scores it ply moves from the root. Returns None if the position
+    is not in them.
+    """
+    plies = probeTablebase(position)
+    if plies is None:
+        return None
+    if plies<0:
+        return 0
+    if plies%2:
+        return MATE_SCORE - (ply + plies)
+    return -(MATE_SCORE - (ply + plies))
+
+
+def tablebaseMove(position,colorsign):
+    """
+    tablebaseMove(position,colorsign) - If the position is in the tablebases, returns the move
+    with the best tablebase value: the fastest mate when winning, the slowest when losing.
+    Promotions to other pieces than a queen are tried too, and written [pos,target,piece] as
+    in allMoves(). Otherwise returns [].
+    """
+    if tablebaseScore(position,0) is None:
+        return []
+    bestMove = []
+    bestValue = -1000000
+    #Promoting to a rook can win where a queen would stalemate:
+    for move in allMoves(position,colorsign,True):
+        position.makemove(move[0][0],move[0][1],move[1][0],move[1][1],
+                          move[2] if len(move)>2 else 'Q')
+        score = tablebaseScore(position,1)
+        position.unmakemove()
+        if score is None:
+            return []
+        if -score>bestValue:
+            bestValue = -score
+            bestMove = move
+    return bestMove
+
+
+#///////////////////////////////CHESS PROCESSING FUNCTIONS////////////////////
+
+def drawText(board):
+    """
+    This function is not called in this program. It is useful for debugging
+    purposes, as it allows a board to be printed to the screen in a readable format.    
+    """
+    for i in range(len(board)):
+        for k in range(len(board[i])):
+            if board[i][k]==0:
+                board[i][k] = 'Oo'
+        print (board[i])
+    for i in range(len(board)):
+        for k in range(len(board[i])):
+            if board[i][k]=='Oo':
+                board[i][k] = 0
+
+
+def isOccupied(board,x,y):
+    """
+    Returns true if a given coordinate on the board is not empty, and false otherwise.
+    """
+    if board[y][x] == 0:
+    #The square has nothing on it.
+        return False
+    return True
+
+
+def isOccupiedby(board,x,y,color):
+    """
+    Returns true if the square specified by the coordinates is of the specifc color inputted.
+    """
+    if board[y][x]==0:
+        #the square has nothing on it.
+        return False
+    if board[y][x][1] == color[0]:
+        #The square has a piece of the color inputted.
+        return True
+    #The square has a piece of the opposite color.
+    return False
+
+
+def filterbyColor(board,listofTuples,color):
+    """
+    filterbyColor(board,listofTuples,color) - This function takes the board state, a list
+    of coordinates, and a color as input. It will return the same list, but without
+    coordinates that are out of bounds of the board and also without those occupied by the
+    pieces of the particular color passed to this function as an argument. In other words,
+    if 'white' is passed in, it will not return any white occupied square.
+    """
+    filtered_list = []
+    #Go through each coordinate:
+    for pos in listofTuples:
+        x = pos[0]
+        y = pos[1]
+        if x>=0 and x<=7 and y>=0 and y<=7 and not isOccupiedby(board,x,y,color):
+            #coordinates are on-board and no same-color piece is on the square.
+            filtered_list.append(pos)
+    return filtered_list
+
+
+def lookfor(board,piece):
+    """
+    lookfor(board,piece) - This functions takes the 2D array that represents a board and finds 
+    the indices of all the locations that is occupied by the specified piece. The list of 
+    indices is returned.
+    """
+    listofLocations = []
+    for row in range(8):
+        for col in range(8):
+            if board[row][col] == piece:
+                x = col
+                y = row
+                listofLocations.append((x,y))
+    return listofLocations
+
+
+def isAttackedby(position,target_x,target_y,color):
+    """
+    isAttackedby(position,target_x,target_y,color) - This function checks if the square specified
+    by (target_x,target_y) coordinates is being attacked by any of a specific colored set of pieces.
+    It works outward from the target: a knight, king or pawn attacks the target only if it stands
+    where a knight, king or pawn on the target would attack, and a slider attacks the target only
+    if it is the first piece met along one of its rays. It returns as soon as an attacker is found.
+    """
+    sq = target_y*8 + target_x
+    color = color[0]
+    bitboards = position.bitboards
+    if KNIGHT_ATTACKS[sq] & bitboards['N'+color]:
+        return True
+    #Enemy pawns attacking the target stand where our own pawn on the target would attack:
+    if PAWN_ATTACKS[opp(color)][sq] & bitboards['P'+color]:
+        return True
+    if KING_ATTACKS[sq] & bitboards['K'+color]:
+        return True
+    occupied = position.occupancy['w'] | position.occupancy['b']
+    rooks = bitboards['R'+color] | bitboards['Q'+color]
+    if ROOK_MASKS[sq] & rooks and firstBlockers(sq,occupied,ROOK_RAYS,rooks):
+        return True
+    bishops = bitboards['B'+color] | bitboards['Q'+color]
+    if BISHOP_MASKS[sq] & bishops and firstBlockers(sq,occupied,BISHOP_RAYS,bishops):
+        return True
+    return False
+
+
+def firstBlockers(sq,occupied,rays,sliders):
+    """
+    firstBlockers(sq,occupied,rays,sliders) - Scans the rays going out from sq and returns True
+    as soon as the first occupied square on one of them holds one of the sliders.
+    """
+    for table,increasing in rays:
+        blockers = table[sq] & occupied
+        if blockers:
+            if increasing:
+                first = blockers & -blockers
+            else:
+                first = 1 << (blockers.bit_length() - 1)
+            if first & sliders:
+                return True
+    return False
+
+
+def findPossibleSquares(position,x,y,AttackSearch=False):
+    """
+    findPossibleSquares(position,x,y,AttackSearch=False) - This function takes as its input the
+    current state of the chessboard, and a particular x and y coordinate. It will return for the
+    piece on that board a list of possible coordinates it could move to, including captures and 
+    excluding illegal moves (eg moves that leave a king under check). If AttackSearch is True,
+    the squares attacked by the piece are returned instead (less those of its own color).
+    """
+    #Get individual component data from the position object:
+    board = position.getboard()
+
+    #In case something goes wrong:
+    if board[y][x]==0: #Unexpected, return empty list.
+        return []
+
+    color = board[y][x][1] #w or b.
+    sq = y*8 + x
+    if AttackSearch:
+        occupied = position.occupancy['w'] | position.occupancy['b']
+        targets = pieceAttacks(board[y][x],sq,occupied) & ~position.occupancy[color]
+        return [(sq2&7,sq2>>3) for sq2 in bitsof(targets)]
+
+    #Make sure the king is not under attack as a result of each move:
+    listofTuples = []
+    for sq2 in bitsof(pseudoLegalTargets(position,sq)):
+        if isLegal(position,x,y,sq2&7,sq2>>3):
+            listofTuples.append((sq2&7,sq2>>3))
+    return listofTuples
+
+
+def isLegal(position,x,y,x2,y2):
+    """
+    isLegal(position,x,y,x2,y2) - Takes a move that follows the movement rules of its piece and
+    returns True if it does not leave the king of the side moving under attack.
+    """
+    color = position.board[y][x][1]
+    position.makemove(x,y,x2,y2)
+    legal = not isCheck(position,color)
+    position.unmakemove()
+    return legal
+
+
+def makemove(position,x,y,x2,y2,promotion='Q'):
+    """
+    makemove(position,x,y,x2,y2,promotion) - This function makes a move on the board. The position
+    object gets updated here with new information. (x,y) are coordinates of the piece to be moved,
+    and (x2,y2) are coordinates of the destination. (x2,y2) being correct destination (ie the move
+    a valid one) is not checked for and is assumed to be the case. A promoting pawn becomes a
+    queen unless promotion names another piece. The move can be taken back with
+    position.unmakemove().
+    """
+    position.makemove(x,y,x2,y2,promotion)
+
+
+def opp(color):
+    """
+    opp(color) - Returns the complimentary color to the one passed. 
+    So, inputting 'black' returns 'w', for example.
+    """
+    color = color[0]
+    if color == 'w':
+        oppcolor = 'b'
+    else:
+        oppcolor = 'w'
+    return oppcolor
+
+
+def isCheck(position,color):
+    """
+    isCheck(position,color) - This function takes a position as its input and checks if the
+    King of the specified color is under attack by the enemy. Returns true if that is the case, 
+    and false otherwise.
+    """
+    #Get data:
+    color = color[0]
+    enemy = opp(color)
+    king = position.bitboards['K' + color]
+    #Get the square of the king:
+    sq = king.bit_length() - 1
+    #Check if the position of the king is attacked by
+    #the enemy and return the result:
+    return isAttackedby(position,sq&7,sq>>3,enemy)
+
+
+def isCheckmate(position,color=-1):
+    """
+    isCheckmate(position,color=-1) - This function tells you if a position is a checkmate.
+    Color is an optional argument that may be passed to specifically check for mate against a
+    specific color.
+    """
+    if color==-1:
+        return isCheckmate(position,'white') or isCheckmate(position,'b')
+    color = color[0]
+    if isCheck(position,color) and allMoves(position,color)==[]:
+        #The king is under attack, and there are no possible moves for this side to make:
+            return True
+    #Either the king is not under attack or there are possible moves to be played:
+    return False
+
+
+def isStalemate(position):
+    """
+    isStalemate(position) - This function checks if a 
+    particular position is a stalemate. If it is, it returns true, 
+    otherwise it returns false.
+    Stalemate - a situation in chess where the player whose turn it is 
+    to move is not in check and has no legal move. It leads to a Draw!
+    """
+    #Get player to move:
+    player = position.getplayer()
+    #Get color:
+    if player==0:
+        color = 'w'
+    else:
+        color = 'b'
+    if not isCheck(position,color) and allMoves(position,color)==[]:
+        #The player to move is not under check yet cannot make a move.
+        #It is a stalemate.
+        return True
+    return False
+
+
+def getallpieces(position,color):
+    """
+    getallpieces(position,color) - This function returns a list of positions of all the pieces on
+    the board of a particular color.
+    """
+    return [(sq&7,sq>>3) for sq in bitsof(position.occupancy[color[0]])]
+
+
+def allMoves(position, color, underpromotions=False):
+    """
+    allMoves(position, color, underpromotions) - This function takes as its argument a position and
+    a color/colorsign that represents a side. It generates a list of all possible moves for that
+    side and returns it. Pawns always promote to a queen, unless underpromotions is True: then there
+    is a move for each piece a pawn can promote to, written [pos,target,piece].
+    """
+    #Time spent here is counted in the search statistics (see searchStats):
+    start = time.perf_counter() if SEARCH_STATS else None
+    #Find if it is white to play or black:
+    if color==1:
+        color = 'white'
+    elif color ==-1:
+        color = 'black'
+    color = color[0]
+    moves = []
+    #Loop through each piece controlled by this side:
+    for sq in bitsof(position.occupancy[color]):
+        pos = (sq&7,sq>>3)
+        #For each piece, find all the targets it can attack:
+        targets = findPossibleSquares(position,pos[0],pos[1])
+        for target in targets:
+            #Save them all as possible moves:
+            if (underpromotions and (target[1]==0 or target[1]==7) and
+                position.board[pos[1]][pos[0]][0]=='P'):
+                for piece in 'QRBN':
+                    moves.append([pos,target,piece])
+            else:
+                moves.append([pos,target])
+    if start is not None:
+        searchStats['moveGeneration'] += time.perf_counter() - start
+    return moves
+
+
+def allCaptures(position, color):
+    """
+    allCaptures(position, color) - Like allMoves(), but only generates the captures (including
+    en passant) and promotions of a side. These are the moves searched by quiescence().
+    """
+    start = time.perf_counter() if SEARCH_STATS else None
+    if color==1:
+        color = 'white'
+    elif color ==-1:
+        color = 'black'
+    color = color[0]
+    board = position.board
+    enemies = position.occupancy[opp(color)]
+    #Pawns may also capture on the en passant square or move to the last rank:
+    pawnTargets = enemies | PROMOTION_RANK[color]
+    if position.EnP!=-1:
+        pawnTargets |= 1 << (position.EnP[1]*8 + position.EnP[0])
+    moves = []
+    for sq in bitsof(position.occupancy[color]):
+        x = sq&7
+        y = sq>>3
+        if board[y][x][0] == 'P':
+            targets = pseudoLegalTargets(position,sq) & pawnTargets
+        else:
+            targets = pseudoLegalTargets(position,sq) & enemies
+        for sq2 in bitsof(targets):
+            if isLegal(position,x,y,sq2&7,sq2>>3):
+                moves.append([(x,y),(sq2&7,sq2>>3)])
+    if start is not None:
+        searchStats['moveGeneration'] += time.perf_counter() - start
+    return moves
+
+
+def pos2key(position):
+    """
+    pos2key(position) - This function takes a position as input argument. For this particular 
+    position, it will return a unique key that can be used in a dictionary. This is the
+    Zobrist key of the position, which makemove() keeps up to date, so this costs nothing.
+    """
+    return position.key
+
+
+def convertOpenings(openings):
+    """
+    convertOpenings(openings) - The opening table used to be keyed by tuples made of the board
+    rows, the player to move and the castling rights. This function returns the same table keyed
+    by Zobrist keys instead. Keys that are already Zobrist keys are kept as they are.
+    """
+    converted = defaultdict(list)
+    for key,moves in openings.items():
+        if isinstance(key,tuple):
+            boardTuple,player,rights = key
+            old_position = GamePosition([list(row) for row in boardTuple],player,
+                                        [list(rights[0]),list(rights[1])],-1,0)
+            key = pos2key(old_position)
+        for move in moves:
+            if move not in converted[key]:
+                converted[key].append(move)
+    return converted
+
+
+def encodeBookMove(move):
+    """
+    encodeBookMove(move) - Packs a move into the 16 bits of a book record: the destination square
+    in bits 0-5, the origin square in bits 6-11 and the promotion piece in bits 12-14 (0 for a
+    queen, which this program doesn't name, then 1-3 for a knight, bishop or rook).
+    """
+    (x,y),(x2,y2) = move[0],move[1]
+    code = (y2*8 + x2) | (y*8 + x) << 6
+    if len(move)>2 and move[2]!='Q':
+        code |= (' NBR'.index(move[2])) << 12
+    return code
+
+
+def decodeBookMove(code):
+    """
+    decodeBookMove(code) - The reverse of encodeBookMove().
+    """
+    sq = (code >> 6) & 63
+    sq2 = code & 63
+    move = [(sq&7,sq>>3),(sq2&7,sq2>>3)]
+    if code >> 12:
+        move.append(' NBR'[(code >> 12) & 7])
+    return move
+
+
+def writeBook(entries,filename=OPENING_BOOK):
+    """
+    writeBook(entries,filename) - Writes an opening book file (see OpeningBook) from a dictionary
+    of {key: [(move,weight),...]}. The weights of a position are scaled down if the largest
+    doesn't fit in a record, keeping every move at least 1.
+    """
+    records = []
+    for key,moves in entries.items():
+        largest = max([weight for move,weight in moves] + [1])
+        for move,weight in moves:
+            if largest>BOOK_MAX_WEIGHT:
+                weight = max(1,weight*BOOK_MAX_WEIGHT//largest)
+            records.append((key,-weight,encodeBookMove(move)))
+    records.sort()
+    #Write to another file first, in case the book being replaced is open:
+    with open(filename+'.tmp','wb') as file_handle:
+        for key,weight,code in records:
+            file_handle.write(BOOK_RECORD.pack(key,code,-weight))
+    os.replace(filename+'.tmp',filename)
+
+
+def loadOpenings(filename=OPENING_BOOK):
+    """
+    loadOpenings(filename) - Opens the opening book in the given file as openings, and returns
+    it. If there is no such file, the AI plays without an opening book.
+    """
+    global openings
+    openings.close()
+    openings = OpeningBook(filename)
+    return openings
+
+
+def saveOpenings(recorded,filename=OPENING_BOOK):
+    """
+    saveOpenings(recorded,filename) - Adds moves recorded while playing, given as a dictionary of
+    {key: [move,...]}, to the opening book in the given file. A move already in the book is
+    counted once more.
+    """
+    book = OpeningBook(filename)
+    entries = book.entries()
+    book.close()
+    for key,moves in recorded.items():
+        weights = dict((encodeBookMove(move),weight) for move,weight in entries[key])
+        for move in moves:
+            code = encodeBookMove(move)
+            weights[code] = weights.get(code,0) + 1
+        entries[key] = [(decodeBookMove(code),weight) for code,weight in weights.items()]
+    if openings.file_handle is not None and openings.file_handle.name==filename:
+        openings.close()
+    writeBook(entries,filename)
+
+
+def bookMove(position,colorsign):
+    """
+    bookMove(position,colorsign) - Returns a move of the opening book for this position, chosen
+    at random in proportion to the weights, or [] if the book has no (legal) move for it.
+    """
+    legal = allMoves(position,colorsign)
+    choices = [(move,weight) for move,weight in openings.moves(pos2key(position)) if move in legal]
+    if choices==[]:
+        return []
+    return random.choices([move for move,weight in choices],
+                          [weight for move,weight in choices])[0]
+
+
+def fen2pos(fen):
+    """
+    fen2pos(fen) - Returns the GamePosition described by a FEN string, e.g.
+    'rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1'. The move counters at the end
+    may be left out, as in EPD.
+    """
+    fields = fen.split()
+    board = []
+    for row in fields[0].split('/'):
+        board.append([])
+        for char in row:
+            if char.isdigit():
+                board[-1].extend([0]*int(char))
+            elif char.isupper():
+                board[-1].append(char+'w')
+            else:
+                board[-1].append(char.upper()+'b')
+    player = 0 if fields[1]=='w' else 1
+    castling_rights = [['K' in fields[2],'Q' in fields[2]],['k' in fields[2],'q' in fields[2]]]
+    if fields[3]=='-':
+        En_Passant_Target = -1
+    else:
+        En_Passant_Target = ('abcdefgh'.index(fields[3][0]),8-int(fields[3][1]))
+    if len(fields)>4 and fields[4].isdigit():
+        half_move_clock = int(fields[4])
+    else:
+        half_move_clock = 0
+    return GamePosition(board,player,castling_rights,En_Passant_Target,half_move_clock)
+
+
+def pos2fen(position):
+    """
+    pos2fen(position) - Returns the FEN string of a position (see fen2pos()). The position does
+    not know the move number, so it is always written as 1.
+    """
+    rows = []
+    for row in position.board:
+        text = ''
+        empty = 0
+        for piece in row:
+            if piece==0:
+                empty+=1
+                continue
+            if empty:
+                text += str(empty)
+                empty = 0
+            if piece[1]=='w':
+                text += piece[0]
+            else:
+                text += piece[0].lower()
+        if empty:
+            text += str(empty)
+        rows.append(text)
+    rights = ''.join(letter for letter,right in zip('KQkq',position.castling[0]+position.castling[1])
+                     if right) or '-'
+    if position.EnP==-1:
+        target = '-'
+    else:
+        target = 'abcdefgh'[position.EnP[0]] + str(8-position.EnP[1])
+    return ' '.join(['/'.join(rows),'wb'[position.player],rights,target,str(position.HMC),'1'])
+
+
+def move2uci(move):
+    """
+    move2uci(move) - Returns a move in the notation of the UCI protocol, e.g. 'e2e4', or 'e7e8n'
+    for a promotion to a knight. The piece is only written if the move names it (see allMoves()).
+    """
+    (x,y),(x2,y2) = move[0],move[1]
+    text = 'abcdefgh'[x] + str(8-y) + 'abcdefgh'[x2] + str(8-y2)
+    if len(move)>2:
+        text += move[2].lower()
+    return text
+
+
+def uci2move(text):
+    """
+    uci2move(text) - The reverse of move2uci().
+    """
+    move = [('abcdefgh'.index(text[0]),8-int(text[1])),('abcdefgh'.index(text[2]),8-int(text[3]))]
+    if len(text)>4:
+        move.append(text[4].upper())
+    return move
+
+
+def san2move(position,san):
+    """
+    san2move(position,san) - Returns the move written san in standard algebraic notation (as in
+    PGN files, e.g. 'Nbd7', 'exd5', 'O-O', 'e8=N+') in this position, in the format of
+    allMoves(). Raises ValueError if it is not exactly one legal move.
+    """
+    color = 'wb'[position.player]
+    text = san.rstrip('+#!?')
+    if text in ('O-O','0-0','O-O-O','0-0-0'):
+        y = 7 if color=='w' else 0
+        x2 = 6 if len(text)==3 else 2
+        if (position.board[y][4]=='K'+color and
+            (x2,y) in findPossibleSquares(position,4,y)):
+            return [(4,y),(x2,y)]
+        raise ValueError('illegal move ' + san)
+    promotion = None
+    if '=' in text:
+        text,promotion = text.split('=')
+    elif text[-1] in 'NBRQ' and len(text)>2 and text[0] in 'abcdefgh':
+        text,promotion = text[:-1],text[-1]
+    if len(text)<2 or text[-2] not in 'abcdefgh' or text[-1] not in '12345678':
+        raise ValueError('not a move ' + san)
+    x2 = 'abcdefgh'.index(text[-2])
+    y2 = 8 - int(text[-1])
+    if text[0] in 'NBRQK':
+        kind = text[0]
+        origin = text[1:-2].replace('x','')
+    else:
+        kind = 'P'
+        origin = text[:-2].replace('x','')
+    #Only look at the pieces of the right kind that can reach the destination square:
+    candidates = []
+    for sq in bitsof(position.bitboards[kind+color]):
+        x = sq&7
+        y = sq>>3
+        if origin and any((char in 'abcdefgh' and 'abcdefgh'.index(char)!=x) or
+                          (char in '12345678' and 8-int(char)!=y) for char in origin):
+            continue
+        if pseudoLegalTargets(position,sq) >> (y2*8 + x2) & 1 and isLegal(position,x,y,x2,y2):
+            candidates.append([(x,y),(x2,y2)])
+    if len(candidates)!=1:
+        raise ValueError(('ambiguous move ' if candidates else 'illegal move ') + san)
+    move = candidates[0]
+    if kind=='P' and (y2==0 or y2==7) and promotion not in (None,'Q'):
+        move.append(promotion)
+    return move
+
+
+def initialPosition():
+    """
+    initialPosition() - Returns a new GamePosition with the pieces where they are at the start
+    of a game, and white to move.
+    """
+    board = [ ['Rb', 'Nb', 'Bb', 'Qb', 'Kb', 'Bb', 'Nb', 'Rb'], #8
+              ['Pb', 'Pb', 'Pb', 'Pb', 'Pb', 'Pb', 'Pb', 'Pb'], #7
+              [  0,    0,    0,    0,    0,    0,    0,    0],  #6
+              [  0,    0,    0,    0,    0,    0,    0,    0],  #5
+              [  0,    0,    0,    0,    0,    0,    0,    0],  #4
+              [  0,    0,    0,    0,    0,    0,    0,    0],  #3
+              ['Pw', 'Pw', 'Pw',  'Pw', 'Pw', 'Pw', 'Pw', 'Pw'], #2
+              ['Rw', 'Nw', 'Bw',  'Qw', 'Kw', 'Bw', 'Nw', 'Rw'] ]#1
+              # a      b     c     d     e     f     g     h
+    #In chess some data must be stored that is not apparent in the board:
+    player = 0 
+    castling_rights = [[True, True],[True, True]]
+    En_Passant_Target = -1
+    half_move_clock = 0 
+    return GamePosition(board,player,castling_rights,En_Passant_Target,half_move_clock)
+
+
+def negamax(position,
+            depth,
+            alpha,
+            beta,
+            colorsign,
+            bestMoveReturn,
+            root=True,
+            ply=0):
+    """
+    It will generate moves and analyse resulting positions to decide the 
+    best move to be played for the AI, searching to a fixed depth. At the root the move
+    is assigned to bestMoveReturn. Every node returns its value: if it is alpha or less, it is
+    only an upper bound, if it is beta or more, only a lower bound. If the time for the
+    move runs out, SearchTimeout is raised. The result of each node is
+    also stored in the transposition table, so that a position that occurs elsewhere in
+    the tree is not searched again to the same depth, and its best move is tried first.
+    
+    Parameters:
+    -----------
+    position - state of the board \n
+    depth - depth to which moves should be analysed \n
+    alpha - lower bound to a position's possible \n
+    beta - upper bound to a position's possible \n
+    colorsign - indicates the player to move \n
+    bestMoveReturn - list that will be assigned the move to be played \n
+    root - variable that keeps track of whether the original node is
+        processing now or a  lower node.\n 
+    ply - number of moves made since the root\n
+    """
+
+    global nodes
+    nodes += 1
+    #Every so often, check whether the time for this move is up:
+    if nodes & 255 == 0:
+        checkpoint()
+
+    key = pos2key(position)
+
+    #A position that already occurred is scored as a draw, as the side that can improve on
+    #it would not repeat it. So is one where the fifty move rule applies, unless it is mate:
+    if not root and (position.repetitions() or
+                     position.HMC>=100 and not isCheck(position,'wb'[position.player])):
+        return 0
+
+    #With few pieces left, the tablebases may know the exact result:
+    if (tablebases and not root and
+        bin(position.occupancy['w'] | position.occupancy['b']).count('1')<=TABLEBASE_PIECES):
+        score = tablebaseScore(position,ply)
+        if score is not None:
+            return score
+
+    if depth==0:
+        #Don't stop in the middle of a sequence of captures:
+        return quiescence(position,alpha,beta,colorsign,ply)
+
+    #See if this position was already searched deep enough:
+    alphaOrig = alpha
+    hashMove = None
+    start = time.perf_counter() if SEARCH_STATS else None
+    entry = table.probe(key)
+    if start is not None:
+        searchStats['hashing'] += time.perf_counter() - start
+    tableStats['probes'] += 1
+    if entry is not None:
+        tableStats['hits'] += 1
+        hashMove = entry[4]
+        if entry[1]>=depth and not root:
+            flag = entry[2]
+            value = valueFromTable(entry[3],ply)
+            if flag == EXACT:
+                tableStats['cutoffs'] += 1
+                return value
+            elif flag == LOWERBOUND:
+                alpha = max(alpha,value)
+            else:
+                beta = min(beta,value)
+            if alpha>=beta:
+                tableStats['cutoffs'] += 1
+                return value
+
+    color = 'wb'[position.player]
+    inCheck = isCheck(position,color)
+
+    #Null move pruning. Passing is allowed neither in check nor twice in a row, nor when the
+    #side to move has only pawns left, as in such endings having to move can be a disadvantage
+    #(zugzwang) and passing would make the position look better than it is:
+    if (NULL_MOVE and not root and not inCheck and depth>=NULL_MOVE_MIN_DEPTH and
+        position.undoStack and position.undoStack[-1][0] is not None and
+        beta<MATE_BOUND and
+        (position.bitboards['N'+color] | position.bitboards['B'+color] |
+         position.bitboards['R'+color] | position.bitboards['Q'+color]) and
+        colorsign*evaluate(position)>=beta):
+        position.makenullmove()
+        value = -negamax(position,depth-1-NULL_MOVE_REDUCTION,-beta,-beta+1,-colorsign,[],
+                         False,ply+1)
+        position.unmakemove()
+        if value>=beta:
+            #A mate found after passing is not proven, so only the bound is returned then:
+            return value if value<MATE_BOUND else beta
+
+    moves = allMoves(position, colorsign)
+
+    if moves==[]:
+        #The game is over: checkmate if the side to move is in check, otherwise stalemate.
+        #Mates closer to the root score higher, so the AI mates as fast as it can and
+        #delays being mated as long as it can:
+        if inCheck:
+            return -(MATE_SCORE - ply)
+        return 0
+
+    #Search the most promising moves first, so that cutoffs happen as early as possible:
+    moves = orderMoves(position,moves,hashMove,ply)
+
+    bestMove = moves[0]
+
+    bestValue = -100000
+
+    for index,move in enumerate(moves):
+        position.makemove(move[0][0],move[0][1],move[1][0],move[1][1])
+        captured = position.undoStack[-1][3]
+        #Late move reductions: a quiet move ordered this late rarely turns out best, so it
+        #is first searched less deeply. Not when in check, for checks, promotions and
+        #killer moves, or where the depth is already low:
+        reduction = 0
+        if (LATE_MOVE_REDUCTIONS and index>=LMR_MOVES and depth>=LMR_MIN_DEPTH and
+            not inCheck and captured == 0 and move not in killers[ply] and
+            not (position.undoStack[-1][2][0] == 'P' and move[1][1] in (0,7)) and
+            not isCheck(position,opp(color))):
+            reduction = 1 if index<2*LMR_MOVES else min(2,depth-2)
+        if index == 0:
+            value = -negamax(position,depth-1,-beta,-alpha,-colorsign,[],False,ply+1)
+        else:
+            #Principal variation search: with good move ordering the first move is the best,
+            #so the others only need to be shown worse than alpha, which a null window
+            #(alpha,alpha+1) does with far fewer nodes. A move that beats alpha is searched
+            #again, at full depth if it was reduced, then with the full window:
+            value = -negamax(position,depth-1-reduction,-alpha-1,-alpha,-colorsign,[],
+                             False,ply+1)
+            if value>alpha and reduction:
+                value = -negamax(position,depth-1,-alpha-1,-alpha,-colorsign,[],False,ply+1)
+            if alpha<value<beta:
+                value = -negamax(position,depth-1,-beta,-alpha,-colorsign,[],False,ply+1)
+        position.unmakemove()
+
+        if value>bestValue:
+            bestValue = value
+            bestMove = move
+
+        alpha = max(alpha,value)
+        if alpha>=beta:
+            orderingStats['cutoffs'] += 1
+            if index == 0:
+                orderingStats['firstMoveCutoffs'] += 1
+            cutoffIndex[min(index,CUTOFF_INDEXES-1)] += 1
+            if captured == 0:
+                #Remember quiet moves that cause cutoffs, for ordering sibling nodes:
+                updateKillers(position,move,depth,ply)
+            break
+
+    #A value that failed low is only an upper bound, one that failed high a lower bound:
+    if bestValue<=alphaOrig:
+        flag = UPPERBOUND
+    elif bestValue>=beta:
+        flag = LOWERBOUND
+    else:
+        flag = EXACT
+    start = time.perf_counter() if SEARCH_STATS else None
+    table.store(key,depth,flag,valueToTable(bestValue,ply),bestMove)
+    if start is not None:
+        searchStats['hashing'] += time.perf_counter() - start
+
+    if root:
+        bestMoveReturn[:] = bestMove
+
+    return bestValue
+
+
+def valueToTable(value,ply):
+    """
+    valueToTable(value,ply) - Mate scores depend on the distance from the root, but a position
+    in the transposition table may be reached at any ply. They are stored as the distance to
+    mate from the position itself, and converted back by valueFromTable().
+    """
+    if value>=MATE_BOUND:
+        return value + ply
+    if value<=-MATE_BOUND:
+        return value - ply
+    return value
+
+
+def valueFromTable(value,ply):
+    if value>=MATE_BOUND:
+        return value - ply
+    if value<=-MATE_BOUND:
+        return value + ply
+    return value
+
+
+def orderMoves(position,moves,hashMove,ply):
+    """
+    orderMoves(position,moves,hashMove,ply) - Returns the moves sorted so that those most likely
+    to cause an alpha-beta cutoff come first: the move stored in the transposition table, then
+    captures and promotions by MVV-LVA (most valuable victim, least valuable attacker), then the
+    killer moves of this ply, then the remaining quiet moves by their history score.
+    """
+    board = position.board
+    EnP_Target = position.EnP
+    killer1,killer2 = killers[ply]
+    base = position.player*4096
+    scored = []
+    for move in moves:
+        if move == hashMove:
+            score = HASH_MOVE_SCORE
+        else:
+            score = captureScore(board,EnP_Target,move)
+        if score == 0:
+            #A quiet move:
+            if move == killer1:
+                score = KILLER_SCORE
+            elif move == killer2:
+                score = KILLER_SCORE - 1
+            else:
+                (x,y),(x2,y2) = move
+                score = min(historyTable[base + (y*8+x)*64 + y2*8+x2],KILLER_SCORE - 2)
+        scored.append((score,move))
+    scored.sort(key=lambda scoredMove: scoredMove[0],reverse=True)
+    return [move for score,move in scored]
+
+
+def captureScore(board,EnP_Target,move):
+    """
+    captureScore(board,EnP_Target,move) - Returns the MVV-LVA ordering score of a capture or
+    promotion (most valuable victim first, then least valuable attacker), or 0 for quiet moves.
+    """
+    (x,y),(x2,y2) = move
+    attacker = board[y][x][0]
+    victim = board[y2][x2]
+    if victim!=0:
+        return CAPTURE_SCORE + 10*MVV_LVA_ORDER[victim[0]] - MVV_LVA_ORDER[attacker]
+    if attacker == 'P':
+        if y2 == 0 or y2 == 7:
+            #A promotion wins a queen:
+            return CAPTURE_SCORE + 10*MVV_LVA_ORDER['Q']
+        if EnP_Target == (x2,y2):
+            return CAPTURE_SCORE + 10*MVV_LVA_ORDER['P'] - MVV_LVA_ORDER['P']
+    return 0
+
+
+def quiescence(position,alpha,beta,colorsign,ply):
+    """
+    quiescence(position,alpha,beta,colorsign,ply) - Called by negamax() instead of evaluating
+    a position straight away when the depth runs out. Only captures and promotions are searched,
+    until the position is quiet, so that a position isn't judged in the middle of an exchange
+    (the horizon effect). The side to move may also "stand pat": decline all captures and take
+    the static evaluation, since it is never forced to capture. Captures that could not bring
+    the score back up to alpha even if the victim came for free are skipped (delta pruning).
+    """
+    global nodes
+    nodes += 1
+    if nodes & 255 == 0:
+        checkpoint()
+
+    standPat = colorsign*evaluate(position)
+    searchStats['evaluations'] += 1
+    if standPat>=beta:
+        return standPat
+    alpha = max(alpha,standPat)
+
+    board = position.board
+    EnP_Target = position.EnP
+    captures = [(captureScore(board,EnP_Target,move),move)
+                for move in allCaptures(position,colorsign)]
+    captures.sort(key=lambda scoredMove: scoredMove[0],reverse=True)
+
+    for score,move in captures:
+        (x,y),(x2,y2) = move
+        #Delta pruning (promotions are never pruned):
+        if not (board[y][x][0] == 'P' and (y2 == 0 or y2 == 7)):
+            victim = board[y2][x2]
+            gain = PIECE_VALUES[victim[0]] if victim!=0 else PIECE_VALUES['P']
+            if standPat + gain + DELTA_MARGIN <= alpha:
+                continue
+        position.makemove(x,y,x2,y2)
+        value = -quiescence(position,-beta,-alpha,-colorsign,ply+1)
+        position.unmakemove()
+        if value>=beta:
+            return value
+        alpha = max(alpha,value)
+    return alpha
+
+
+def updateKillers(position,move,depth,ply):
+    """
+    updateKillers(position,move,depth,ply) - Called when a quiet move caused a beta cutoff. The
+    move becomes the first killer move of its ply, and its history score grows with the square
+    of the remaining depth, since cutoffs near the root save the most work.
+    """
+    if move != killers[ply][0]:
+        killers[ply][1] = killers[ply][0]
+        killers[ply][0] = move
+    (x,y),(x2,y2) = move
+    historyTable[position.player*4096 + (y*8+x)*64 + y2*8+x2] += depth*depth
+
+
+def newOrderingSearch():
+    """
+    newOrderingSearch() - Resets the move ordering data at the start of a search. Killer moves
+    are forgotten and history scores are halved, so older results slowly lose their weight.
+    """
+    for ply in range(MAX_PLY):
+        killers[ply] = [None,None]
+    for i in range(len(historyTable)):
+        historyTable[i] >>= 1
+    orderingStats['cutoffs'] = 0
+    orderingStats['firstMoveCutoffs'] = 0
+    for i in range(CUTOFF_INDEXES):
+        cutoffIndex[i] = 0
+
+
+def newGame():
+    """
+    newGame() - Forgets everything the AI learned in earlier searches (the transposition table,
+    killer moves and history scores), as at the start of a game. A search started after this
+    always searches the same nodes, which makes it usable as a benchmark.
+    """
+    table.clear()
+    for ply in range(MAX_PLY):
+        killers[ply] = [None,None]
+    for i in range(len(historyTable)):
+        historyTable[i] = 0
+
+
+def firstMoveCutoffRate():
+    """
+    firstMoveCutoffRate() - Returns the percentage of beta cutoffs of the last search that
+    happened on the first move searched. The better the move ordering, the closer to 100.
+    """
+    if orderingStats['cutoffs'] == 0:
+        return 0.0
+    return 100.0*orderingStats['firstMoveCutoffs']/orderingStats['cutoffs']
+
+
+def tableHitRate():
+    """
+    tableHitRate() - Returns the percentage of transposition table probes of the last search that
+    found an entry for the position (whether or not it was deep enough to be used).
+    """
+    if tableStats['probes'] == 0:
+        return 0.0
+    return 100.0*tableStats['hits']/tableStats['probes']
+
+
+def checkpoint():
+    """
+    checkpoint() - Called by the search every 256 nodes. Publishes the node count of a helper
+    process of a parallel search, and raises SearchTimeout once the time for the move is up.
+    """
+    if nodeCounter is not None:
+        nodeCounter[workerIndex] = nodes
+    if time.time() > deadline:
+        raise SearchTimeout()
+
+
+def iterativeDeepening(position,colorsign,bestMoveReturn,timeLimit=MOVE_TIME,maxDepth=DEPTH,
+                       workers=None,useBook=True):
+    """
+    iterativeDeepening(position,colorsign,bestMoveReturn,timeLimit,maxDepth,workers,useBook) -
+    This function is run in a thread to find the AI's move. It first checks the opening book and
+    the endgame tablebases to see if there is a move that it can play without searching. Otherwise it calls
+    negamax() to depth 1, 2, 3... until timeLimit seconds have passed, and assigns to
+    bestMoveReturn the move of the deepest search that completed. Each iteration stores its best
+    moves in the transposition table, where the next, deeper iteration finds them and tries them
+    first.
+
+    With more than one worker (by default SEARCH_WORKERS), the search is parallel (Lazy SMP):
+    workers-1 helper processes search the same position at the same time, sharing the
+    transposition table. They don't return anything; they fill the table with results that let
+    this process search faster.
+    Statistics of the search are left in lastSearch, including the time and node count at which
+    each iteration completed.
+    """
+    global nodes,deadline,softDeadline,searchStart
+
+    if workers is None:
+        workers = SEARCH_WORKERS
+    if useBook and pos2key(position) in openings:
+        move = bookMove(position,colorsign)
+        if move!=[]:
+            bestMoveReturn[:] = move
+            if SEARCH_STATS:
+                logSearch(position,move,'book')
+            return
+    #In an ending of the tablebases, the best move is known without searching:
+    if tablebases:
+        move = tablebaseMove(position,colorsign)
+        if move!=[]:
+            bestMoveReturn[:] = move
+            if SEARCH_STATS:
+                logSearch(position,move,'tablebase')
+            return
+
+    #The phase of the game is that of the root for the whole search (see evaluate()):
+    position.gamePlies = len(position.history)
+    if workers>1:
+        useSharedTable()
+    table.newSearch()
+    newOrderingSearch()
+    start = searchStart = time.time()
+    deadline = start + timeLimit
+    #The next iteration takes several times longer than the last one, so don't start it
+    #unless there is plenty of time left:
+    softDeadline = start + timeLimit/2.0
+    nodes = 0
+    for name in tableStats:
+        tableStats[name] = 0
+    for name in searchStats:
+        searchStats[name] = 0
+    iterations = []
+    helpers,counters = startHelpers(position,colorsign,maxDepth,workers)
+    try:
+        bestMove,depth = deepen(position,colorsign,1,maxDepth,iterations)
+    finally:
+        helperNodes = stopHelpers(helpers,counters)
+
+    if bestMove==[]:
+        #Not even the first iteration completed (or there is no legal move at all):
+        bestMove = (allMoves(position,colorsign) + [[]])[0]
+    bestMoveReturn[:] = bestMove
+
+    lastSearch['depth'] = depth
+    lastSearch['time'] = time.time() - start
+    lastSearch['nodes'] = nodes + helperNodes
+    lastSearch['helperNodes'] = helperNodes
+    lastSearch['workers'] = len(helpers) + 1
+    lastSearch['tableHitRate'] = tableHitRate()
+    lastSearch['iterations'] = [{'depth': iterationDepth, 'time': finish - start,
+                                 'nodes': iterationNodes}
+                                for iterationDepth,finish,iterationNodes in iterations]
+    lastSearch['ebf'] = effectiveBranchingFactor(lastSearch['iterations'])
+    lastSearch['evaluations'] = searchStats['evaluations']
+    lastSearch['tableProbes'] = tableStats['probes']
+    lastSearch['tableHits'] = tableStats['hits']
+    lastSearch['tableCutoffs'] = tableStats['cutoffs']
+    lastSearch['pawnHitRate'] = 100.0*searchStats['pawnHits']/max(searchStats['pawnProbes'],1)
+    lastSearch['cutoffs'] = orderingStats['cutoffs']
+    lastSearch['cutoffIndex'] = cutoffIndex[:]
+    #A search stopped by stopSearch() (pondering on the wrong move) didn't make a move:
+    if SEARCH_STATS and deadline>0.0:
+        logSearch(position,bestMove,'search')
+
+
+def effectiveBranchingFactor(iterations):
+    """
+    effectiveBranchingFactor(iterations) - Returns how many times more nodes the last iteration
+    of a search took than the one before it, given the iterations listed in lastSearch. With
+    perfect move ordering this is about the square root of the number of legal moves. Returns
+    None if fewer than two iterations completed.
+    """
+    if len(iterations)<2:
+        return None
+    counts = [iterations[0]['nodes']] + [iterations[i]['nodes'] - iterations[i-1]['nodes']
+                                         for i in range(1,len(iterations))]
+    return counts[-1]/float(max(counts[-2],1))
+
+
+def logSearch(position,move,source):
+    """
+    logSearch(position,move,source) - Appends the statistics of the AI's move in this position
+    to SEARCH_LOG, as one line of JSON. source tells where the move came from: 'book',
+    'tablebase' or 'search'. For a search, the record holds what lastSearch does, the
+    number of nodes per iteration, and the seconds spent in move generation, evaluation and
+    the transposition table (the rest of the time goes to making moves, ordering them and the
+    search itself).
+    """
+    record = {'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+              'fen': pos2fen(position),
+              'move': move2uci(move) if move else '',
+              'source': source}
+    if source == 'search':
+        record.update(lastSearch)
+        #Leave out the indexes after the last one that caused a cutoff:
+        counts = lastSearch['cutoffIndex']
+        last = len(counts)
+        while last>0 and counts[last-1]==0:
+            last -= 1
+        record['cutoffIndex'] = counts[:last]
+        record['firstMoveCutoffRate'] = firstMoveCutoffRate()
+        previous = 0
+        record['nodesPerDepth'] = []
+        for iteration in lastSearch['iterations']:
+            record['nodesPerDepth'].append(iteration['nodes'] - previous)
+            previous = iteration['nodes']
+        seconds = dict((name,searchStats[name])
+                       for name in ('moveGeneration','evaluation','hashing'))
+        seconds['other'] = max(0.0,lastSearch['time'] - sum(seconds.values()))
+        record['timeSplit'] = seconds
+    with open(SEARCH_LOG,'a') as file_handle:
+        file_handle.write(json.dumps(record) + '\n')
+
+
+def deepen(position,colorsign,startDepth,maxDepth,iterations=None):
+    """
+    deepen(position,colorsign,startDepth,maxDepth,iterations) - The iterative deepening loop.
+    Searches to startDepth, startDepth+1... maxDepth until the search times out, not starting
+    a new iteration after the time softDeadline. Returns the best move of the deepest iteration
+    that completed, and that depth. If a list is given as iterations, (depth,time,nodes) is
+    appended to it as each iteration completes.
+    """
+    undoDepth = len(position.undoStack)
+    bestMove = []
+    bestDepth = 0
+    score = None
+    for depth in range(startDepth,maxDepth+1):
+        result = []
+        try:
+            #Aspiration windows: the score rarely changes much from one iteration to the next,
+            #and a narrow window around the last one cuts off more. If the score falls outside,
+            #the search is repeated with a wider window on that side:
+            window = ASPIRATION_WINDOW
+            if depth>=ASPIRATION_MIN_DEPTH and score is not None and abs(score)<MATE_BOUND:
+                alpha,beta = score-window,score+window
+            else:
+                alpha,beta = -1000000,1000000
+            while True:
+                score = negamax(position,depth,alpha,beta,colorsign,result)
+                window *= 4
+                if score<=alpha and alpha>-1000000:
+                    alpha = score-window if window<MATE_SCORE else -1000000
+                elif score>=beta and beta<1000000:
+                    beta = score+window if window<MATE_SCORE else 1000000
+                else:
+                    break
+        except SearchTimeout:
+            #Take back the moves the interrupted search was in the middle of:
+            while len(position.undoStack)>undoDepth:
+                position.unmakemove()
+            break
+        if result!=[]:
+            bestMove = result
+            bestDepth = depth
+        if iterations is not None:
+            iterations.append((depth,time.time(),nodes))
+        if time.time() > softDeadline:
+            break
+    return bestMove,bestDepth
+
+
+def useSharedTable():
+    """
+    useSharedTable() - Replaces the transposition table by one in shared memory, so that the
+    helper processes of a parallel search can use it too. Only the first parallel search does
+    this; the table then stays shared.
+    """
+    global table
+    if not isinstance(table,SharedTranspositionTable):
+        table = SharedTranspositionTable()
+
+
+def startHelpers(position,colorsign,maxDepth,workers):
+    """
+    startHelpers(position,colorsign,maxDepth,workers) - Starts workers-1 helper processes for a
+    parallel search, if the transposition table is shared with them. Returns the processes
+    and the shared array in which they publish their node counts.
+    """
+    if workers<=1 or not isinstance(table,SharedTranspositionTable):
+        return [],None
+    counters = multiprocessing.RawArray('Q',workers)
+    helpers = []
+    for index in range(1,workers):
+        #The table is passed along so that helpers which are not forked from this process
+        #(as on Windows) get the shared one too:
+        helper = multiprocessing.Process(target=helperSearch,
+                                         args=(position.clone(),colorsign,deadline,maxDepth,
+                                               index,counters,table))
+        helper.daemon = True
+        helper.start()
+        helpers.append(helper)
+    return helpers,counters
+
+
+def helperSearch(position,colorsign,helperDeadline,maxDepth,index,counters,sharedTable):
+    """
+    helperSearch(position,colorsign,helperDeadline,maxDepth,index,counters,sharedTable) - Runs
+    in a helper process of a parallel search. Half of the helpers start one ply deeper than the
+    main process, so that they don't all search the same nodes in the same order at the same time.
+    """
+    global nodes,deadline,softDeadline,nodeCounter,workerIndex,table
+    nodes = 0
+    deadline = helperDeadline
+    softDeadline = float('inf')
+    nodeCounter = counters
+    workerIndex = index
+    table = sharedTable
+    newOrderingSearch()
+    deepen(position,colorsign,1 + index%2,maxDepth)
+    counters[index] = nodes
+
+
+def stopHelpers(helpers,counters):
+    """
+    stopHelpers(helpers,counters) - Stops the helper processes once the main process has its
+    move, and returns the number of nodes they searched.
+    """
+    for helper in helpers:
+        helper.terminate()
+    for helper in helpers:
+        helper.join()
+    if counters is None:
+        return 0
+    return sum(counters[1:])
+
+
+def measureSpeedup(position,colorsign,depth,workers=multiprocessing.cpu_count()):
+    """
+    measureSpeedup(position,colorsign,depth,workers) - Searches a position to a fixed depth in one
+    process, then with the given number of workers, each time starting from an empty table and
+    no killer moves or history scores. Returns the times and node counts (of all the processes)
+    of the two searches. benchmark.py --workers prints them for its positions.
+    """
+    global table
+    oldTable = table
+    times = []
+    counts = []
+    for count in (1,workers):
+        table = TranspositionTable()
+        newGame()
+        start = time.time()
+        iterativeDeepening(position.clone(),colorsign,[],float('inf'),depth,count,False)
+        times.append(time.time() - start)
+        counts.append(lastSearch['nodes'])
+    table = oldTable
+    return times[0],times[1],counts[0],counts[1]
+
+
+def moveTime(clock,increment=AI_INCREMENT,movesToGo=30):
+    """
+    moveTime(clock,increment,movesToGo) - Returns the number of seconds the AI should spend on
+    its next move. Without a clock, this is MOVE_TIME. With a clock, the remaining time is shared
+    out over the next movesToGo moves, plus most of the increment, and never more than half of
+    what is left.
+    """
+    if clock is None:
+        return MOVE_TIME
+    return max(0.05,min(clock/float(movesToGo) + 0.8*increment,clock/2.0))
+
+
+def predictReply(position):
+    """
+    predictReply(position) - Returns the move the AI expects the human to play in this position:
+    the move the last search found best there, if it is still in the transposition table and
+    legal. Returns [] if there is none. The AI can then ponder: search the position after that
+    move while the human thinks.
+    """
+    entry = table.probe(pos2key(position))
+    if entry is None or entry[4] is None:
+        return []
+    for move in allMoves(position,'wb'[position.player]):
+        if move == entry[4]:
+            return move
+    return []
+
+
+def ponderHit(timeLimit):
+    """
+    ponderHit(timeLimit) - Called when the human plays the move the AI is pondering on. The
+    pondering search, started with no time limit, becomes the search of the AI's move: it now
+    stops timeLimit seconds from now, and keeps everything it has already searched. If it has
+    already searched for longer than that, it stops at once with the deepest iteration it completed.
+    """
+    global deadline,softDeadline
+    now = time.time()
+    if now - searchStart >= timeLimit:
+        timeLimit = 0.0
+    softDeadline = now + timeLimit/2.0
+    deadline = now + timeLimit
+
+
+def stopSearch():
+    """
+    stopSearch() - Makes the search running in another thread stop at its next checkpoint, e.g.
+    when the human didn't play the move the AI was pondering on. What it stored in the
+    transposition table is kept.
+    """
+    global deadline,softDeadline
+    softDeadline = 0.0
+    deadline = 0.0
+
+
+def evaluate(position):
+    """
+    evaluate(position) - This function takes as input a position to be analysed.
+    It will look at the positioning of pieces on the board to judge whether white
+    has an advantage or black. If it returns zero, it means it considers the 
+    position to be equal for both sides. \n A positive value is an advantage to the
+    white side and a negative value is an advantage to the black side. The material
+    and piece square table scores are kept up to date by the position as moves are
+    made, so only the pawn structure is worked out here. This is a static evaluation:
+    checkmate and stalemate are found by negamax() when a side has no moves.
+    """
+    start = time.perf_counter() if SEARCH_STATS else None
+
+    whiteMaterial = position.material['w']
+    blackMaterial = position.material['b']
+    numofmoves = position.gamePlies
+    if numofmoves>40 or (whiteMaterial<14 and blackMaterial<14):
+        #The ending:
+        evaluation1 = position.endgameScore
+    else:
+        evaluation1 = position.openingScore
+
+    #Doubled and isolated pawns only depend on the pawns, and come from the pawn table:
+    evaluation2 = pawnStructure(position)[1]
+    #Blocked pawns (with an enemy piece right in front of them) also depend on the other
+    #pieces, but are quickly counted on the bitboards:
+    bitboards = position.bitboards
+    Sw = bin((bitboards['Pw'] >> 8) & position.occupancy['b']).count('1')
+    Sb = bin((bitboards['Pb'] << 8) & position.occupancy['w']).count('1')
+    evaluation2 -= 30*(Sw-Sb)
+
+    evaluation = evaluation1 + evaluation2
+
+    if start is not None:
+        searchStats['evaluation'] += time.perf_counter() - start
+    return evaluation
+
+
+def makeScoreTables():
+    """
+    makeScoreTables() - Combines the material values and the piece square tables into one
+    score per piece and square, for the opening and for the ending (only the king table
+    differs between them). Scores of black pieces are negative and use the tables upside down,
+    since the tables were designed for white.
+    """
+    tables = {'P': pawn_table, 'N': knight_table, 'B': bishop_table,
+              'R': rook_table, 'Q': queen_table, 'K': king_table}
+    openingScores = {}
+    endgameScores = {}
+    for kind in 'PNBRQK':
+        for color in 'wb':
+            opening = []
+            ending = []
+            for sq in range(64):
+                if color == 'w':
+                    i = sq
+                    sign = +1
+                else:
+                    i = (7-sq//8)*8 + sq%8
+                    sign = -1
+                opening.append(sign*(PIECE_VALUES[kind] + tables[kind][i]))
+                if kind == 'K':
+                    ending.append(sign*(PIECE_VALUES[kind] + king_endgame_table[i]))
+                else:
+                    ending.append(opening[-1])
+            openingScores[kind+color] = opening
+            endgameScores[kind+color] = ending
+    return openingScores,endgameScores
+
+
+def evaluationScores(position):
+    """
+    evaluationScores(position) - Works out from scratch the sums that the position keeps up to
+    date as pieces move: the opening score, the ending score, and the material of each side
+    counted in pawns (used to tell the game phase).
+    """
+    openingScore = 0
+    endgameScore = 0
+    material = {'w': 0, 'b': 0}
+    for piece,bitboard in position.bitboards.items():
+        for sq in bitsof(bitboard):
+            openingScore += OPENING_SCORES[piece][sq]
+            endgameScore += ENDGAME_SCORES[piece][sq]
+            material[piece[1]] += PHASE_MATERIAL[piece[0]]
+    return openingScore,endgameScore,material
+
+
+def pawnStructure(position):
+    """
+    pawnStructure(position) - Returns the entry of the pawn table for the pawns of a position,
+    computing and storing it if it isn't there: (pawnKey,score,passed). score is the pawn
+    structure term of evaluate() (30 per doubled or isolated pawn, from white's point of view)
+    and passed the bitboards of the passed pawns of white and black.
+    """
+    entry = pawnTable.probe(position.pawnKey)
+    searchStats['pawnProbes'] += 1
+    if entry is not None:
+        searchStats['pawnHits'] += 1
+        return entry
+    board = position.board
+    score = -30*(doubledPawns(board,'white') - doubledPawns(board,'black') +
+                 isolatedPawns(board,'white') - isolatedPawns(board,'black'))
+    passed = []
+    for color,enemy in (('w','b'),('b','w')):
+        pawns = 0
+        for sq in bitsof(position.bitboards['P'+color]):
+            if not PASSED_MASKS[color][sq] & position.bitboards['P'+enemy]:
+                pawns |= 1 << sq
+        passed.append(pawns)
+    passed = tuple(passed)
+    pawnTable.store(position.pawnKey,score,passed)
+    return (position.pawnKey,score,passed)
+
+
+def doubledPawns(board,color):
+    """
+    doubledPawns(board,color) - This function counts the number of doubled pawns
+    for a player and returns it. Doubled pawns are those that are on the same file.
+    """
+    color = color[0]
+    listofpawns = lookfor(board,'P'+color)
+    repeats = 0
+    temp = []
+    for pawnpos in listofpawns:
+        if pawnpos[0] in temp:
+            repeats = repeats + 1
+        else:
+            temp.append(pawnpos[0])
+    return repeats
+
+
+def isolatedPawns(board,color):
+    """
+    isolatedPawns(board,color) - This function counts the number of isolated pawns
+    for a player. These are pawns that do not have supporting pawns on adjacent files
+    and so are difficult to protect.
+    """
+    color = color[0]
+    listofpawns = lookfor(board,'P'+color)
+    #Get x coordinates of all the pawns:
+    xlist = [x for (x,y) in listofpawns]
+    isolated = 0
+    for x in xlist:
+        if x!=0 and x!=7:
+            #For non-edge cases:
+            if x-1 not in xlist and x+1 not in xlist:
+                isolated+=1
+        elif x==0 and 1 not in xlist:
+            #Left edge:
+            isolated+=1
+        elif x==7 and 6 not in xlist:
+            #Right edge:
+            isolated+=1
+    return isolated
+
+
+########## PIECE SQUARE TABLES ################
+
+#Store the piece square tables here so they can be accessed globally by makeScoreTables() function:
+pawn_table = [  0,  0,  0,  0,  0,  0,  0,  0,
+50, 50, 50, 50, 50, 50, 50, 50,
+10, 10, 20, 30, 30, 20, 10, 10,
+ 5,  5, 10, 25, 25, 10,  5,  5,
+ 0,  0,  0, 20, 20,  0,  0,  0,
+ 5, -5,-10,  0,  0,-10, -5,  5,
+ 5, 10, 10,-20,-20, 10, 10,  5,
+ 0,  0,  0,  0,  0,  0,  0,  0]
+
+knight_table = [-50,-40,-30,-30,-30,-30,-40,-50,
+-40,-20,  0,  0,  0,  0,-20,-40,
+-30,  0, 10, 15, 15, 10,  0,-30,
+-30,  5, 15, 20, 20, 15,  5,-30,
+-30,  0, 15, 20, 20, 15,  0,-30,
+-30,  5, 10, 15, 15, 10,  5,-30,
+-40,-20,  0,  5,  5,  0,-20,-40,
+-50,-90,-30,-30,-30,-30,-90,-50]
+
+bishop_table = [-20,-10,-10,-10,-10,-10,-10,-20,
+-10,  0,  0,  0,  0,  0,  0,-10,
+-10,  0,  5, 10, 10,  5,  0,-10,
+-10,  5,  5, 10, 10,  5,  5,-10,
+-10,  0, 10, 10, 10, 10,  0,-10,
+-10, 10, 10, 10, 10, 10, 10,-10,
+-10,  5,  0,  0,  0,  0,  5,-10,
+-20,-10,-90,-10,-10,-90,-10,-20]
+
+rook_table = [0,  0,  0,  0,  0,  0,  0,  0,
+  5, 10, 10, 10, 10, 10, 10,  5,
+ -5,  0,  0,  0,  0,  0,  0, -5,
+ -5,  0,  0,  0,  0,  0,  0, -5,
+ -5,  0,  0,  0,  0,  0,  0, -5,
+ -5,  0,  0,  0,  0,  0,  0, -5,
+ -5,  0,  0,  0,  0,  0,  0, -5,
+  0,  0,  0,  5,  5,  0,  0,  0]
+
+queen_table = [-20,-10,-10, -5, -5,-10,-10,-20,
+-10,  0,  0,  0,  0,  0,  0,-10,
+-10,  0,  5,  5,  5,  5,  0,-10,
+ -5,  0,  5,  5,  5,  5,  0, -5,
+  0,  0,  5,  5,  5,  5,  0, -5,
+-10,  5,  5,  5,  5,  5,  0,-10,
+-10,  0,  5,  0,  0,  0,  0,-10,
+-20,-10,-10, 70, -5,-10,-10,-20]
+
+king_table = [-30,-40,-40,-50,-50,-40,-40,-30,
+-30,-40,-40,-50,-50,-40,-40,-30,
+-30,-40,-40,-50,-50,-40,-40,-30,
+-30,-40,-40,-50,-50,-40,-40,-30,
+-20,-30,-30,-40,-40,-30,-30,-20,
+-10,-20,-20,-20,-20,-20,-20,-10,
+ 20, 20,  0,  0,  0,  0, 20, 20,
+ 20, 30, 10,  0,  0, 10, 30, 20]
+
+king_endgame_table = [-50,-40,-30,-20,-20,-30,-40,-50,
+-30,-20,-10,  0,  0,-10,-20,-30,
+-30,-10, 20, 30, 30, 20,-10,-30,
+-30,-10, 30, 40, 40, 30,-10,-30,
+-30,-10, 30, 40, 40, 30,-10,-30,
+-30,-10, 20, 30, 30, 20,-10,-30,
+-30,-30,  0,  0,  0,  0,-30,-30,
+-50,-30,-30,-30,-30,-30,-30,-50]
+
+#Material plus piece square table score of every piece on every square, in the opening
+#and in the ending. GamePosition keeps the sums of these up to date as pieces move:
+OPENING_SCORES,ENDGAME_SCORES = makeScoreTables()
+
+
+#Opening book of the AI (see loadOpenings()):
+openings = OpeningBook()
+#Endgame tablebases by ending, e.g. 'KQK' (see loadTablebases()):
+tablebases = {}
+
+#Pawn structure table of the evaluation (see pawnStructure()):
+pawnTable = PawnTable()
+#Transposition table of the AI. It is kept from one move to the next. When the AI searches
+#with several processes, it is replaced by one in shared memory (see useSharedTable()):
+table = TranspositionTable()
+#Move ordering data: two killer moves per ply, a history score per (player,from,to),
+#and the number of beta cutoffs (and of those on the first move) in the last search:
+killers = [[None,None] for ply in range(MAX_PLY)]
+historyTable = [0]*(2*64*64)
+orderingStats = {'cutoffs': 0, 'firstMoveCutoffs': 0}
+#Transposition table probes of the current search, how many of them found an entry, and how
+#many of those ended the search of the node:
+tableStats = {'probes': 0, 'hits': 0, 'cutoffs': 0}
+#Beta cutoffs of the current search by the index of the move that caused them:
+cutoffIndex = [0]*CUTOFF_INDEXES
+#Static evaluations at the leaves (in quiescence()) of the current search, pawn table probes
+#and hits, and when SEARCH_STATS is set, the seconds spent in move generation, evaluate() and
+#the transposition table, timed inside allMoves(), allCaptures(), evaluate() and negamax():
+searchStats = {'evaluations': 0, 'pawnProbes': 0, 'pawnHits': 0,
+               'moveGeneration': 0.0, 'evaluation': 0.0, 'hashing': 0.0}
+#Nodes searched for the current move, the time at which the search must stop, the time
+#after which it doesn't start a new iteration, and the time it started:
+nodes = 0
+deadline = float('inf')
+softDeadline = float('inf')
+searchStart = 0.0
+#In a helper process of a parallel search, the shared array where it publishes its node
+#count and its index there:
+nodeCounter = None
+workerIndex = 0
+#Statistics of the last search of the AI:
+lastSearch = {'depth': 0, 'time': 0.0, 'nodes': 0, 'helperNodes': 0, 'workers': 1,
+              'tableHitRate': 0.0, 'iterations': [], 'ebf': None, 'evaluations': 0,
+              'tableProbes': 0, 'tableHits': 0, 'tableCutoffs': 0, 'pawnHitRate': 0.0, 'cutoffs': 0,
+              'cutoffIndex': [0]*CUTOFF_INDEXES}
@@ -0,0 +1,195 @@
+"""
+makebook.py - Builds the binary opening book of the AI (openingBook.bin, see OpeningBook in
+engine.py).
+
+    $ python makebook.py --pickle openingTable.txt      #Convert the old pickled opening table
+    $ python makebook.py --pgn games.pgn --plies 20     #Build the book from a game database
+"""
+import argparse
+import multiprocessing
+import pickle
+import re
+import time
+from collections import defaultdict
+from engine import (OpeningBook, OPENING_BOOK, convertOpenings, writeBook, initialPosition,
+                    san2move, encodeBookMove, decodeBookMove)
+
+
+#Moves of each game added to the book by default, games handed to a worker process at once:
+BOOK_PLIES = 20
+GAMES_PER_BATCH = 500
+#Parts of PGN movetext that are not moves: comments, NAGs, move numbers and results:
+NOT_MOVES = re.compile(r'\{[^}]*\}|;[^\n]*|\$\d+|\d+\.(\.\.)?|1-0|0-1|1/2-1/2|\*')
+
+
+def readPickleBook(filename):
+    """
+    readPickleBook(filename) - Reads an opening table pickled by older versions of this program
+    (a dictionary of positions, keyed by tuples or by Zobrist keys, to lists of moves), and
+    returns it as book entries of {key: [(move,weight),...]}, every move with weight 1.
+    """
+    with open(filename,'rb') as file_handle:
+        #The table was written by Python 2, whose strings are bytes:
+        openings = convertOpenings(pickle.loads(file_handle.read(),encoding='latin1'))
+    entries = defaultdict(list)
+    for key,moves in openings.items():
+        for move in moves:
+            entries[key].append(([tuple(move[0]),tuple(move[1])] + list(move[2:]),1))
+    return entries
+
+
+def readGames(filename):
+    """
+    readGames(filename) - Yields the movetext of each game of a PGN file, reading the file one
+    line at a time so that files of any size can be read. Games that don't start from the
+    initial position (with a FEN tag) are skipped.
+    """
+    movetext = []
+    setUp = False
+    inTags = False
+    with open(filename,encoding='utf-8',errors='replace') as file_handle:
+        for line in file_handle:
+            line = line.strip()
+            if line.startswith('['):
+                if not inTags or line.startswith('[Event '):
+                    #The first tag of the next game ends the previous one, even if it had
+                    #no moves (its tags are ended by an empty line, or the next Event tag):
+                    if movetext and not setUp:
+                        yield ' '.join(movetext)
+                    movetext = []
+                    setUp = False
+                    inTags = True
+                if line.startswith('[FEN ') or line.startswith('[SetUp "1"'):
+                    setUp = True
+            elif not line:
+                inTags = False
+            elif not line.startswith('%'):
+                movetext.append(line)
+                inTags = False
+    if movetext and not setUp:
+        yield ' '.join(movetext)
+
+
+def sanMoves(movetext):
+    """
+    sanMoves(movetext) - Returns the moves of the main line of PGN movetext, in SAN.
+    """
+    #Remove the variations, innermost first:
+    while '(' in movetext:
+        text = re.sub(r'\([^()]*\)',' ',movetext)
+        if text==movetext:
+            break
+        movetext = text
+    return NOT_MOVES.sub(' ',movetext).split()
+
+
+def countBookMoves(games,plies):
+    """
+    countBookMoves(games,plies) - Plays through the first plies moves of each game (given as PGN
+    movetext) and returns how many times each move was played in each position, as a dictionary
+    of {(key,move code): count}. A game stops counting at its first unreadable move.
+    """
+    counts = defaultdict(int)
+    for movetext in games:
+        position = initialPosition()
+        for san in sanMoves(movetext)[:plies]:
+            try:
+                move = san2move(position,san)
+            except ValueError:
+                break
+            counts[(position.key,encodeBookMove(move))] += 1
+            position.makemove(move[0][0],move[0][1],move[1][0],move[1][1],
+                              move[2] if len(move)>2 else 'Q')
+    return counts
+
+
+def readPGNBook(filenames,plies=BOOK_PLIES,workers=None,minCount=1):
+    """
+    readPGNBook(filenames,plies,workers,minCount) - Builds book entries from the first plies moves
+    of every game in the given PGN files, each move weighted by the number of games it was played
+    in. Moves played in fewer than minCount games are left out. The games are parsed in batches
+    by a pool of worker processes, while this process reads the files and adds up the counts;
+    only a few batches are in memory at any time.
+    """
+    workers = workers or multiprocessing.cpu_count()
+    counts = defaultdict(int)
+    games = 0
+
+    def collect(result):
+        for move,count in result.get().items():
+            counts[move] += count
+
+    pool = multiprocessing.Pool(workers)
+    try:
+        pending = []
+        for filename in filenames:
+            batch = []
+            for movetext in readGames(filename):
+                batch.append(movetext)
+                if len(batch)==GAMES_PER_BATCH:
+                    pending.append(pool.apply_async(countBookMoves,(batch,plies)))
+                    games += len(batch)
+                    batch = []
+                    #Don't read further ahead than the workers can parse:
+                    while len(pending)>2*workers:
+                        collect(pending.pop(0))
+            if batch:
+                pending.append(pool.apply_async(countBookMoves,(batch,plies)))
+                games += len(batch)
+        for result in pending:
+            collect(result)
+    finally:
+        pool.terminate()
+    entries = defaultdict(list)
+    for (key,code),count in counts.items():
+        if count>=minCount:
+            entries[key].append((decodeBookMove(code),count))
+    return entries,games
+
+
+def mergeEntries(entries,more):
+    """
+    mergeEntries(entries,more) - Adds the book entries more to entries, adding up the weights of
+    moves found in both.
+    """
+    for key,moves in more.items():
+        weights = dict((tuple(map(tuple,move[:2])) + tuple(move[2:]),weight)
+                       for move,weight in entries.get(key,[]))
+        for move,weight in moves:
+            move = tuple(map(tuple,move[:2])) + tuple(move[2:])
+            weights[move] = weights.get(move,0) + weight
+        entries[key] = [(list(move),weight) for move,weight in weights.items()]
+    return entries
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build the binary opening book.')
+    parser.add_argument('--pickle',action='append',default=[],
+                        help='old pickled opening table to convert (may be repeated)')
+    parser.add_argument('--pgn',action='append',default=[],
+                        help='PGN file of games to add to the book (may be repeated)')
+    parser.add_argument('--plies',type=int,default=BOOK_PLIES,
+                        help='number of moves of each game to add (default %d)' % BOOK_PLIES)
+    parser.add_argument('--min-count',type=int,default=1,
+                        help='leave out moves played in fewer games than this')
+    parser.add_argument('--workers',type=int,default=multiprocessing.cpu_count(),
+                        help='processes parsing the games')
+    parser.add_argument('--append',action='store_true',help='keep the moves already in the book')
+    parser.add_argument('-o','--output',default=OPENING_BOOK,help='book file to write')
+    args = parser.parse_args()
+
+    entries = defaultdict(list)
+    if args.append:
+        book = OpeningBook(args.output)
+        entries = book.entries()
+        book.close()
+    for filename in args.pickle:
+        mergeEntries(entries,readPickleBook(filename))
+    if args.pgn:
+        start = time.time()
+        pgnEntries,games = readPGNBook(args.pgn,args.plies,args.workers,args.min_count)
+        print('%d games read in %.1f s' % (games,time.time()-start))
+        mergeEntries(entries,pgnEntries)
+    writeBook(entries,args.output)
+    print('%d positions, %d moves written to %s' %
+          (len(entries),sum(len(moves) for moves in entries.values()),args.output))
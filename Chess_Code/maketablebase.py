@@ -0,0 +1,234 @@
+"""
+maketablebase.py - Generates the endgame tablebases of the AI (see probeTablebase() in engine.py)
+by retrograde analysis: starting from the checkmates, it works backwards one ply at a time to
+find every position that mates in 1, is mated in 2, mates in 3, and so on. Whatever is left at
+the end is a draw.
+
+    $ python maketablebase.py               #All endings (KBNK takes a while)
+    $ python maketablebase.py KQK KRK
+"""
+import argparse
+import os
+import time
+from engine import (KING_ATTACKS, KNIGHT_ATTACKS, PAWN_ATTACKS, TABLEBASE_DIR, TABLEBASE_ENDINGS,
+                    TRIANGLE_SQUARES, bitsof, bishopAttacks, rookAttacks, tablebaseIndex,
+                    tablebaseSize)
+
+
+#Pieces a pawn may promote to, and the endings it then turns into (only those that can win):
+PROMOTIONS = {'Q': 'KQK', 'R': 'KRK'}
+
+
+def decode(ending,index):
+    """
+    decode(ending,index) - The reverse of tablebaseIndex(): returns the player to move, the
+    squares of the white king and of the black king, and the list of squares of the other white
+    pieces.
+    """
+    player = index & 1
+    index >>= 1
+    squares = []
+    for i in range(len(ending)-1):
+        squares.append(index & 63)
+        index >>= 6
+    squares.reverse()
+    if 'P' in ending:
+        wk = (index >> 2)*8 + (index & 3)
+    else:
+        wk = TRIANGLE_SQUARES[index]
+    return player,wk,squares[0],squares[1:]
+
+
+def whiteAttacks(kinds,pieces,occupied):
+    """
+    whiteAttacks(kinds,pieces,occupied) - Returns the squares attacked by the white pieces (the
+    king excepted) of the given kinds, standing on the given squares.
+    """
+    attacks = 0
+    for kind,sq in zip(kinds,pieces):
+        if kind=='Q':
+            attacks |= rookAttacks(sq,occupied) | bishopAttacks(sq,occupied)
+        elif kind=='R':
+            attacks |= rookAttacks(sq,occupied)
+        elif kind=='B':
+            attacks |= bishopAttacks(sq,occupied)
+        elif kind=='N':
+            attacks |= KNIGHT_ATTACKS[sq]
+        else:
+            attacks |= PAWN_ATTACKS['w'][sq]
+    return attacks
+
+
+def blackMoves(kinds,wk,bk,pieces):
+    """
+    blackMoves(kinds,wk,bk,pieces) - Returns the squares the black king can move to without
+    capturing, whether it can capture a piece (which is a draw in all these endings), and whether
+    it is in check.
+    """
+    pieceBits = 0
+    for sq in pieces:
+        pieceBits |= 1 << sq
+    occupied = pieceBits | 1 << wk
+    #The squares behind the king along a slider's line are attacked too once the king moves:
+    attacked = KING_ATTACKS[wk] | whiteAttacks(kinds,pieces,occupied)
+    targets = KING_ATTACKS[bk] & ~attacked
+    return targets & ~pieceBits, (targets & pieceBits) != 0, attacked >> bk & 1
+
+
+def whiteUnmoves(kinds,wk,bk,pieces):
+    """
+    whiteUnmoves(kinds,wk,bk,pieces) - Yields the (wk,pieces) of the positions, white to move,
+    from which a white move leads to this one. Moves that give up a piece or promote are not
+    taken back, as they come from other endings.
+    """
+    occupied = 1 << wk | 1 << bk
+    for sq in pieces:
+        occupied |= 1 << sq
+    for sq in bitsof(KING_ATTACKS[wk] & ~occupied & ~KING_ATTACKS[bk]):
+        yield sq,pieces
+    for i,(kind,sq) in enumerate(zip(kinds,pieces)):
+        if kind=='P':
+            origins = 0
+            if sq >> 3 <= 5 and not occupied >> (sq+8) & 1:
+                origins = 1 << (sq+8)
+                if sq >> 3 == 4 and not occupied >> (sq+16) & 1:
+                    origins |= 1 << (sq+16)
+        elif kind=='N':
+            origins = KNIGHT_ATTACKS[sq] & ~occupied
+        else:
+            origins = whiteAttacks(kind,[sq],occupied) & ~occupied
+        for origin in bitsof(origins):
+            yield wk,pieces[:i] + [origin] + pieces[i+1:]
+
+
+def generate(ending,promotionTables):
+    """
+    generate(ending,promotionTables) - Computes the tablebase of an ending, given the tablebases
+    of the endings its pawn can promote into. Returns it as a bytearray.
+    """
+    pawns = 'P' in ending
+    kinds = ending[1:-1]
+    result = bytearray(tablebaseSize(ending))
+    #Positions found to mate or be mated in each number of plies, still to be stored:
+    buckets = [[]]
+
+    def push(plies,index):
+        while len(buckets)<=plies:
+            buckets.append([])
+        buckets[plies].append(index)
+
+    #Positions whose result does not come from another position of this ending: checkmates,
+    #and wins by promotion:
+    for index in range(len(result)):
+        player,wk,bk,pieces = decode(ending,index)
+        squares = set([wk,bk] + pieces)
+        if (len(squares)<len(pieces)+2 or KING_ATTACKS[wk] >> bk & 1 or
+            any(kind=='P' and (sq>>3==0 or sq>>3==7) for kind,sq in zip(kinds,pieces)) or
+            tablebaseIndex(pawns,player,wk,bk,pieces)!=index):
+            #Impossible positions, and those stored under another index by symmetry:
+            continue
+        targets,canCapture,check = blackMoves(kinds,wk,bk,pieces)
+        if player==1:
+            if not targets and not canCapture and check:
+                push(0,index)
+            continue
+        if check:
+            #Black in check with white to move can't happen:
+            continue
+        for i,(kind,sq) in enumerate(zip(kinds,pieces)):
+            if kind=='P' and sq>>3==1 and sq-8 not in squares:
+                for piece,table in promotionTables.items():
+                    promoted = kinds[:i] + piece + kinds[i+1:]
+                    child = tablebaseIndex('P' in promoted,1,wk,bk,
+                                           pieces[:i] + [sq-8] + pieces[i+1:])
+                    value = table[child]
+                    if value and (value-1)%2==0:
+                        push(value,index)
+
+    plies = 0
+    while plies<len(buckets):
+        for index in buckets[plies]:
+            if result[index]:
+                continue
+            result[index] = plies+1
+            player,wk,bk,pieces = decode(ending,index)
+            if player==1:
+                #Black is mated in plies: every white move leading here mates in plies+1.
+                for wk2,pieces2 in whiteUnmoves(kinds,wk,bk,pieces):
+                    if not blackMoves(kinds,wk2,bk,pieces2)[2]:
+                        previous = tablebaseIndex(pawns,0,wk2,bk,pieces2)
+                        if not result[previous]:
+                            push(plies+1,previous)
+            else:
+                #White mates in plies: a black position leading here is lost if all its moves
+                #lead to a white win, in as many plies as the slowest of them plus one.
+                occupied = 1 << wk
+                for sq in pieces:
+                    occupied |= 1 << sq
+                for bk2 in bitsof(KING_ATTACKS[bk] & ~occupied & ~KING_ATTACKS[wk]):
+                    previous = tablebaseIndex(pawns,1,wk,bk2,pieces)
+                    if result[previous]:
+                        continue
+                    targets,canCapture,check = blackMoves(kinds,wk,bk2,pieces)
+                    if canCapture:
+                        continue
+                    slowest = 0
+                    for sq in bitsof(targets):
+                        value = result[tablebaseIndex(pawns,0,wk,sq,pieces)]
+                        if value==0:
+                            break
+                        slowest = max(slowest,value)
+                    else:
+                        push(slowest,previous)
+        buckets[plies] = None
+        plies += 1
+    return result
+
+
+def summary(ending,result):
+    """
+    summary(ending,result) - Returns a line of statistics about a tablebase: the number of legal
+    positions with white to move, how many of them white wins, and the longest mate.
+    """
+    legal = 0
+    wins = 0
+    longest = 0
+    kinds = ending[1:-1]
+    for index in range(0,len(result),2):
+        player,wk,bk,pieces = decode(ending,index)
+        if (len(set([wk,bk] + pieces))<len(pieces)+2 or KING_ATTACKS[wk] >> bk & 1 or
+            any(kind=='P' and (sq>>3==0 or sq>>3==7) for kind,sq in zip(kinds,pieces)) or
+            tablebaseIndex('P' in ending,0,wk,bk,pieces)!=index or
+            blackMoves(kinds,wk,bk,pieces)[2]):
+            continue
+        legal += 1
+        if result[index]:
+            wins += 1
+            longest = max(longest,result[index]-1)
+    return ('%s: %d positions with white to move, %d won, longest mate in %d moves' %
+            (ending,legal,wins,(longest+1)//2))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate the endgame tablebases.')
+    parser.add_argument('endings',nargs='*',default=list(TABLEBASE_ENDINGS),
+                        help='endings to generate (default: %s)' % ' '.join(TABLEBASE_ENDINGS))
+    parser.add_argument('-d','--directory',default=TABLEBASE_DIR,help='where to write them')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.directory):
+        os.makedirs(args.directory)
+    tables = {}
+    for ending in args.endings:
+        promotionTables = {}
+        if 'P' in ending:
+            for piece,promoted in PROMOTIONS.items():
+                if promoted not in tables:
+                    with open(os.path.join(args.directory,promoted+'.bin'),'rb') as file_handle:
+                        tables[promoted] = bytearray(file_handle.read())
+                promotionTables[piece] = tables[promoted]
+        start = time.time()
+        tables[ending] = generate(ending,promotionTables)
+        with open(os.path.join(args.directory,ending+'.bin'),'wb') as file_handle:
+            file_handle.write(tables[ending])
+        print('%s (%.1f s)' % (summary(ending,tables[ending]),time.time()-start))
@@ -0,0 +1,290 @@
+"""
+match.py - Plays the AI against itself in two configurations (e.g. different depths, time limits,
+or with a search feature turned off) to find out which is stronger. The games are played by a pool
+of processes, start from openings picked at random from the opening book (each one played twice,
+with the colors swapped), and are reported as wins, draws and losses of the first configuration
+with the Elo difference and its 95% error bars, plus the time, nodes and depth of their moves.
+
+    $ python match.py --engine depth=4 --engine depth=3 --games 20
+    $ python match.py --engine time=1 --engine time=1,nullmove=off,lmr=off --games 100 --workers 8
+
+A configuration is a comma separated list of settings: depth (maximum depth), time (seconds per
+move), nullmove, lmr and tablebases (on or off). A configuration with a depth but no time searches
+every move to that depth whatever it takes; with neither, it gets MATCH_TIME seconds per move.
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import random
+import time
+import engine
+
+
+#Seconds per move of a configuration that gives neither a depth nor a time, book moves played
+#at the start of each game at most, and plies after which a game is adjudicated a draw:
+MATCH_TIME = 0.5
+OPENING_PLIES = 8
+MAX_PLIES = 300
+RESULTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),'match_results.json')
+DEFAULT_SETTINGS = {'depth': engine.DEPTH, 'time': MATCH_TIME, 'nullmove': True, 'lmr': True,
+                    'tablebases': True}
+
+
+def parseConfig(text):
+    """
+    parseConfig(text) - Reads a configuration such as 'depth=4,time=0.5,nullmove=off' into a
+    dictionary of settings, with the defaults of DEFAULT_SETTINGS for those not given, except that
+    a depth given without a time makes the time unlimited, so that the depth is what is compared.
+    Raises ValueError for an unknown setting.
+    """
+    settings = dict(DEFAULT_SETTINGS)
+    given = set()
+    for item in text.split(','):
+        if not item.strip():
+            continue
+        name,_,value = item.partition('=')
+        name = name.strip().lower()
+        if name not in settings:
+            raise ValueError('unknown setting %r (expected one of %s)' %
+                             (name,', '.join(sorted(settings))))
+        given.add(name)
+        if name == 'depth':
+            settings[name] = int(value)
+        elif name == 'time':
+            settings[name] = float(value)
+        else:
+            settings[name] = value.strip().lower() in ('on','1','true','yes')
+    if 'depth' in given and 'time' not in given:
+        settings['time'] = float('inf')
+    return settings
+
+
+def bookOpenings(count,plies=OPENING_PLIES,seed=0):
+    """
+    bookOpenings(count,plies,seed) - Returns count opening lines (lists of moves in UCI notation),
+    each made by following the opening book from the initial position for up to plies moves,
+    choosing moves at random in proportion to their weights. Different lines are returned while
+    the book has enough of them.
+    """
+    rng = random.Random(seed)
+    lines = []
+    tries = 0
+    while len(lines)<count:
+        position = engine.initialPosition()
+        line = []
+        for ply in range(plies):
+            legal = engine.allMoves(position,'wb'[position.player])
+            choices = [(move,weight) for move,weight in engine.openings.moves(position.key)
+                       if move in legal]
+            if choices==[]:
+                break
+            move = rng.choices([move for move,weight in choices],
+                               [weight for move,weight in choices])[0]
+            line.append(engine.move2uci(move))
+            position.makemove(move[0][0],move[0][1],move[1][0],move[1][1])
+        tries += 1
+        if line not in lines or tries>20*count:
+            lines.append(line)
+    return lines
+
+
+def gameOver(position):
+    """
+    gameOver(position) - Returns the result of the game ('1-0', '0-1' or '1/2-1/2') and the reason,
+    or None if the game goes on.
+    """
+    color = 'wb'[position.player]
+    if engine.allMoves(position,color)==[]:
+        if engine.isCheck(position,color):
+            return ('0-1' if color=='w' else '1-0'),'checkmate'
+        return '1/2-1/2','stalemate'
+    if position.HMC>=100:
+        return '1/2-1/2','fifty moves'
+    if position.checkRepition():
+        return '1/2-1/2','repetition'
+    #Neither side can mate with a king and at most one knight or bishop:
+    others = [piece for piece,bitboard in position.bitboards.items()
+              for sq in engine.bitsof(bitboard) if piece[0]!='K']
+    if len(others)==0 or (len(others)==1 and others[0][0] in 'NB'):
+        return '1/2-1/2','insufficient material'
+    if len(position.history)>=MAX_PLIES:
+        return '1/2-1/2','move limit'
+    return None
+
+
+def playGame(job):
+    """
+    playGame(job) - Plays one game in a worker process. job is (game,opening,settings,first):
+    the number of the game, the opening line to start from, the settings of the two
+    configurations, and which of them (0 or 1) plays white. Each configuration keeps its own
+    transposition table and history scores for the game. Returns a dictionary with the result,
+    its reason, the moves, and the (time,nodes,depth) of every move searched by each
+    configuration.
+    """
+    game,opening,settings,first = job
+    engine.loadTablebases()
+    tablebases = dict(engine.tablebases)
+    states = [(engine.TranspositionTable(),[0]*len(engine.historyTable)) for config in settings]
+    position = engine.initialPosition()
+    for text in opening:
+        move = engine.uci2move(text)
+        position.makemove(move[0][0],move[0][1],move[1][0],move[1][1])
+    moves = list(opening)
+    stats = [[],[]]
+    while True:
+        over = gameOver(position)
+        if over is not None:
+            break
+        #The configuration to move:
+        config = first if position.player==0 else 1 - first
+        options = settings[config]
+        engine.table,engine.historyTable = states[config]
+        engine.NULL_MOVE = options['nullmove']
+        engine.LATE_MOVE_REDUCTIONS = options['lmr']
+        engine.tablebases = tablebases if options['tablebases'] else {}
+        colorsign = 1 if position.player==0 else -1
+        move = []
+        #Tablebase moves are not searched, and leave lastSearch as it was:
+        engine.lastSearch['nodes'] = 0
+        start = time.time()
+        engine.iterativeDeepening(position.clone(),colorsign,move,options['time'],
+                                  options['depth'],1,False)
+        seconds = time.time() - start
+        if engine.lastSearch['nodes']:
+            stats[config].append((seconds,engine.lastSearch['nodes'],engine.lastSearch['depth']))
+        moves.append(engine.move2uci(move))
+        position.makemove(move[0][0],move[0][1],move[1][0],move[1][1],
+                          move[2] if len(move)>2 else 'Q')
+    result,reason = over
+    return {'game': game, 'white': first, 'result': result, 'reason': reason,
+            'moves': moves, 'stats': stats}
+
+
+def eloDifference(score):
+    """
+    eloDifference(score) - Returns the Elo rating difference that makes a player score this
+    fraction of the points against the other (0.5 for equal players).
+    """
+    if score<=0.0:
+        return -float('inf')
+    if score>=1.0:
+        return float('inf')
+    return 400.0*math.log10(score/(1.0 - score))
+
+
+def matchScore(games):
+    """
+    matchScore(games) - Returns the wins, draws and losses of the first configuration, its Elo
+    difference with the second, and the lower and upper bounds of its 95% confidence interval
+    (from the standard error of the score per game).
+    """
+    wins = draws = losses = 0
+    for game in games:
+        if game['result'] == '1/2-1/2':
+            draws += 1
+        elif (game['result'] == '1-0') == (game['white'] == 0):
+            wins += 1
+        else:
+            losses += 1
+    count = wins + draws + losses
+    if count == 0:
+        return 0,0,0,0.0,0.0,0.0
+    score = (wins + 0.5*draws)/count
+    deviation = math.sqrt((wins*(1.0-score)**2 + draws*(0.5-score)**2 + losses*score**2)/count)
+    error = 1.96*deviation/math.sqrt(count)
+    return (wins,draws,losses,eloDifference(score),eloDifference(score-error),
+            eloDifference(score+error))
+
+
+def moveStats(games,config):
+    """
+    moveStats(games,config) - Returns the number of moves searched by a configuration in the
+    games, and their average time, nodes, nodes per second and depth.
+    """
+    moves = [move for game in games for move in game['stats'][config]]
+    if not moves:
+        return 0,0.0,0.0,0.0,0.0
+    seconds = sum(move[0] for move in moves)
+    nodes = sum(move[1] for move in moves)
+    return (len(moves),seconds/len(moves),nodes/float(len(moves)),nodes/max(seconds,1e-9),
+            sum(move[2] for move in moves)/float(len(moves)))
+
+
+def runMatch(configs,games,workers,seed=0,plies=OPENING_PLIES):
+    """
+    runMatch(configs,games,workers,seed,plies) - Plays games (rounded up to an even number)
+    between the two configurations, given as strings for parseConfig(), on a pool of worker
+    processes. Prints each result as it comes and returns the list of games.
+    """
+    settings = [parseConfig(config) for config in configs]
+    pairs = (games+1)//2
+    engine.loadOpenings()
+    openings = bookOpenings(pairs,plies,seed)
+    jobs = [(2*pair + first,openings[pair],settings,first)
+            for pair in range(pairs) for first in range(2)]
+    results = []
+    pool = multiprocessing.Pool(workers)
+    try:
+        for game in pool.imap_unordered(playGame,jobs):
+            results.append(game)
+            print('Game %3d: %s - %s  %s (%s, %d plies)' %
+                  (game['game']+1,configs[game['white']],configs[1-game['white']],
+                   game['result'],game['reason'],len(game['moves'])))
+    finally:
+        pool.terminate()
+    results.sort(key=lambda game: game['game'])
+    return results
+
+
+def loadMatch(filename=RESULTS_FILE):
+    """
+    loadMatch(filename) - Reads the configurations and games of a match saved by this script,
+    e.g. for plot_piechart.py.
+    """
+    with open(filename) as file_handle:
+        match = json.load(file_handle)
+    return match['engines'],match['games']
+
+
+def report(configs,games):
+    """
+    report(configs,games) - Prints the score of the match and the move statistics of each
+    configuration.
+    """
+    wins,draws,losses,elo,low,high = matchScore(games)
+    print('%s vs %s: +%d =%d -%d  Elo %+.0f [%+.0f, %+.0f] (95%%)' %
+          (configs[0],configs[1],wins,draws,losses,elo,low,high))
+    for config,name in enumerate(configs):
+        count,seconds,nodes,speed,depth = moveStats(games,config)
+        print('%-30s %5d moves  %.3f s/move  %8.0f nodes/move  %6.0f nodes/s  depth %.2f' %
+              (name,count,seconds,nodes,speed,depth))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Play the AI against itself in two configurations.')
+    parser.add_argument('--engine',action='append',default=[],
+                        help='configuration, e.g. depth=4,time=1,nullmove=off (give two)')
+    parser.add_argument('--games',type=int,default=20,help='number of games (default 20)')
+    parser.add_argument('--workers',type=int,default=multiprocessing.cpu_count(),
+                        help='processes playing games')
+    parser.add_argument('--plies',type=int,default=OPENING_PLIES,
+                        help='book moves at the start of each game (default %d)' % OPENING_PLIES)
+    parser.add_argument('--seed',type=int,default=0,help='seed for choosing the openings')
+    parser.add_argument('-o','--output',default=RESULTS_FILE,help='file to save the games to')
+    args = parser.parse_args()
+    if len(args.engine)!=2:
+        parser.error('give exactly two --engine configurations')
+    for config in args.engine:
+        try:
+            parseConfig(config)
+        except ValueError as error:
+            parser.error(str(error))
+
+    start = time.time()
+    games = runMatch(args.engine,args.games,args.workers,args.seed,args.plies)
+    print('%d games in %.1f s' % (len(games),time.time()-start))
+    report(args.engine,games)
+    with open(args.output,'w') as file_handle:
+        json.dump({'engines': args.engine, 'games': games},file_handle,indent=1)
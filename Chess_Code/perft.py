@@ -0,0 +1,131 @@
+"""
+perft.py - Counts the positions reached by all the legal move sequences of a given length (perft),
+to check that the move generator of engine.py is correct and to measure how fast it is.
+
+    $ python perft.py                       #Reference positions, up to depth 3
+    $ python perft.py --depth 4             #Reference positions, up to depth 4
+    $ python perft.py --fen "<FEN>" --depth 3 --divide
+"""
+import argparse
+import time
+from engine import allMoves, fen2pos, move2uci, pos2fen
+
+
+#Standard test positions with their known perft counts at depth 1, 2, 3...
+#(from https://www.chessprogramming.org/Perft_Results):
+REFERENCE_POSITIONS = [
+    ('Initial position',
+     'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+     [20, 400, 8902, 197281, 4865609]),
+    ('Kiwipete',
+     'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+     [48, 2039, 97862, 4085603]),
+    ('Position 3',
+     '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1',
+     [14, 191, 2812, 43238, 674624]),
+    ('Position 4',
+     'r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1',
+     [6, 264, 9467, 422333]),
+    ('Position 5',
+     'rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8',
+     [44, 1486, 62379, 2103487]),
+    ('Position 6',
+     'r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10',
+     [46, 2079, 89890, 3894594]),
+]
+
+
+def perft(position,depth):
+    """
+    perft(position,depth) - Returns the number of positions reached from this one after depth
+    moves, counting every promotion piece. The moves at the last ply are counted rather than
+    made, as perft programs usually do.
+    """
+    if depth==0:
+        return 1
+    moves = allMoves(position,'wb'[position.player],True)
+    if depth==1:
+        return len(moves)
+    nodes = 0
+    for move in moves:
+        (x,y),(x2,y2) = move[0],move[1]
+        position.makemove(x,y,x2,y2,move[2] if len(move)>2 else 'Q')
+        nodes += perft(position,depth-1)
+        position.unmakemove()
+    return nodes
+
+
+def divide(position,depth):
+    """
+    divide(position,depth) - Like perft(), but returns the count below each move at the root,
+    as a list of (move,count) sorted by move. Comparing it with another program's divide output
+    shows which move the two disagree on.
+    """
+    counts = []
+    for move in allMoves(position,'wb'[position.player],True):
+        (x,y),(x2,y2) = move[0],move[1]
+        position.makemove(x,y,x2,y2,move[2] if len(move)>2 else 'Q')
+        counts.append((move2uci(move),perft(position,depth-1)))
+        position.unmakemove()
+    return sorted(counts)
+
+
+def timedPerft(position,depth):
+    """
+    timedPerft(position,depth) - Runs perft() and returns the count, the seconds it took and the
+    number of nodes per second.
+    """
+    start = time.time()
+    nodes = perft(position,depth)
+    seconds = time.time() - start
+    return nodes,seconds,nodes/max(seconds,1e-9)
+
+
+def runReferencePositions(maxDepth):
+    """
+    runReferencePositions(maxDepth) - Runs perft on every reference position up to maxDepth (or as
+    deep as its count is known), printing the counts and speed. Returns True if every count
+    matched.
+    """
+    allCorrect = True
+    totalNodes = 0
+    totalSeconds = 0.0
+    for name,fen,counts in REFERENCE_POSITIONS:
+        print(name + ': ' + fen)
+        for depth in range(1,min(maxDepth,len(counts))+1):
+            nodes,seconds,speed = timedPerft(fen2pos(fen),depth)
+            totalNodes += nodes
+            totalSeconds += seconds
+            correct = nodes==counts[depth-1]
+            allCorrect = allCorrect and correct
+            print('  depth %d: %10d  %s  %8.3f s  %9.0f nodes/s' %
+                  (depth,nodes,'ok' if correct else 'WRONG (expected %d)' % counts[depth-1],
+                   seconds,speed))
+    print('Total: %d nodes in %.3f s, %.0f nodes/s' %
+          (totalNodes,totalSeconds,totalNodes/max(totalSeconds,1e-9)))
+    print('All counts correct' if allCorrect else 'SOME COUNTS ARE WRONG')
+    return allCorrect
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Count the leaf nodes of the move tree (perft).')
+    parser.add_argument('--fen',help='position to count from (default: the reference positions)')
+    parser.add_argument('--depth',type=int,default=3,help='number of plies (default 3)')
+    parser.add_argument('--divide',action='store_true',help='show the count below each root move')
+    args = parser.parse_args()
+
+    if args.fen is None:
+        raise SystemExit(0 if runReferencePositions(args.depth) else 1)
+    position = fen2pos(args.fen)
+    print(pos2fen(position))
+    if args.divide:
+        start = time.time()
+        counts = divide(position,args.depth)
+        seconds = time.time() - start
+        for move,count in counts:
+            print('%s: %d' % (move,count))
+        nodes = sum(count for move,count in counts)
+        print('Moves: %d' % len(counts))
+    else:
+        nodes,seconds,speed = timedPerft(position,args.depth)
+    print('Nodes: %d  Time: %.3f s  Speed: %.0f nodes/s' % (nodes,seconds,nodes/max(seconds,1e-9)))
@@ -1,7 +1,14 @@
+import sys
 import matplotlib.pyplot as plt
+from match import loadMatch, matchScore, RESULTS_FILE
 
 
-plt.pie([90, 10], labels=['AI Win %', 'Human Win %'], shadow=True, explode=[0.1, 0.1])
-plt.title('Win % of AI at depth 4')
+#Plot the result of the last match.py run (or of the file given):
+engines,games = loadMatch(sys.argv[1] if len(sys.argv)>1 else RESULTS_FILE)
+wins,draws,losses,elo,low,high = matchScore(games)
+
+plt.pie([wins, draws, losses], labels=['Win', 'Draw', 'Loss'], autopct='%1.0f%%',
+        shadow=True, explode=[0.1, 0.1, 0.1])
+plt.title('%s vs %s (%d games, Elo %+.0f)' % (engines[0], engines[1], len(games), elo))
 plt.legend()
 plt.show()
@@ -1,22 +1,26 @@
+import os
+import sys
 import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
+from benchmark import loadResults, RESULTS_FILE, BASELINE_FILE
 
 
-data = pd.DataFrame({"Depth 2": np.array([0.484166538393, 0.452407426612, 0.476388519461,
-                                 0.494060716629, 0.508375865313, 0.425787289182,
-                                 0.500207945434, 0.468787180228, 0.464892190025,
-                                 0.518313879848]),
-                     "Depth 3": np.array([5.81143887623, 8.0421860218, 5.46072000724,
-                                 4.50419720411, 5.82801082004, 7.64024928353,
-                                 5.73390220758, 4.27998794425, 8.44415667928,
-                                 5.68857478703]),
-                     "Depth 4": np.array([27.1332941532, 73.1240674257, 39.321788366,
-                                 51.4939635683, 40.3456965804, 26.1769292897,
-                                 70.2881219672, 36.5946989477, 54.3586571985,
-                                 38.6605024515])
-                     })
+#Plot the results of the last benchmark.py run (or the file given), else those of the baseline:
+if len(sys.argv)>1:
+    results = loadResults(sys.argv[1])
+elif os.path.exists(RESULTS_FILE):
+    results = loadResults(RESULTS_FILE)
+else:
+    results = loadResults(BASELINE_FILE)
 
-data[['Depth 2', 'Depth 3', 'Depth 4']].plot(kind='box', title='Boxplot for time taken at each level')
+#Time taken to reach each depth, over all the positions of the benchmark:
+columns = ['Depth %d' % depth for depth in range(1,results['settings']['depth']+1)]
+data = pd.DataFrame(dict((column, np.array([result['fixedDepth']['timeToDepth'][depth]
+                                            if len(result['fixedDepth']['timeToDepth'])>depth
+                                            else np.nan for result in results['positions']]))
+                         for depth,column in enumerate(columns)))
+
+data[columns].plot(kind='box', title='Boxplot for time taken at each level')
 
 plt.show()
@@ -0,0 +1,29 @@
+"""
+test_tablebases.py - Checks that the mate scores of the endgame tablebases are treated as mates
+by the search, even the longest ones found deep in the tree. Run with pytest.
+"""
+import engine
+
+
+#The longest KBNK mate: black to move gets mated in 66 plies:
+DEEP_KBNK = 'K5N1/3B4/8/4k3/8/8/8/8 b - - 0 1'
+
+
+def test_deep_kbnk_mate_is_a_mate_score():
+    engine.loadTablebases()
+    position = engine.fen2pos(DEEP_KBNK)
+    assert engine.probeTablebase(position) == 66
+    for ply in range(engine.MAX_PLY):
+        value = engine.tablebaseScore(position,ply)
+        assert value == -(engine.MATE_SCORE - (ply + 66))
+        assert value <= -engine.MATE_BOUND
+
+
+def test_deep_kbnk_mate_survives_the_transposition_table():
+    engine.loadTablebases()
+    position = engine.fen2pos(DEEP_KBNK)
+    for ply in range(engine.MAX_PLY):
+        value = engine.tablebaseScore(position,ply)
+        #Stored as the distance to mate from the position itself, whatever the ply:
+        assert engine.valueToTable(value,ply) == engine.tablebaseScore(position,0)
+        assert engine.valueFromTable(engine.valueToTable(value,ply),ply) == value